@@ -1,210 +1,577 @@
 # Add these imports at the top of main.py
-import warnings
-import logging
 import os
+import time
+import hashlib
+import pickle
+import csv
+import io
+import json
+import tempfile
+import logging
+import threading
+import multiprocessing
 from waitress import serve
-# Suppress specific warnings at startup (ADD THIS BEFORE OTHER IMPORTS)
-warnings.filterwarnings("ignore", category=UserWarning, module="camelot")
-warnings.filterwarnings("ignore", message=".*Pattern.*invalid float value.*")
-warnings.filterwarnings("ignore", message=".*does not lie in column range.*")
-
-# Configure logging to suppress pdfminer warnings
-logging.getLogger("pdfminer").setLevel(logging.ERROR)
-logging.getLogger("camelot").setLevel(logging.ERROR)
+# Install warning filters and logger levels once at startup (BEFORE OTHER IMPORTS);
+# worker processes inherit them, so no per-call suppression is needed
+from utilities.warning_config import configure_pdf_processing_warnings
+configure_pdf_processing_warnings()
 
 from flask import Flask, request, jsonify, render_template, send_from_directory, abort
+from flask.json.provider import JSONProvider
 import uuid
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, wait, FIRST_EXCEPTION
+from concurrent.futures.process import BrokenProcessPool
 from datetime import datetime
 from werkzeug.utils import secure_filename
-import glob
+from werkzeug.exceptions import NotFound
+from functools import lru_cache
 # Your existing imports
 from validators import validate_pdf
 from utilities.pdf_parser import extract_text_and_structure
 from utilities.image_detector import extract_images
 from utilities.table_extractor import extract_tables
-from utilities.metadata_extractor import extract_metadata, format_metadata_for_display
+from utilities.metadata_extractor import extract_metadata, extract_file_metadata, format_metadata_for_display, FILE_METADATA_KEYS
 from utilities.ocr import perform_ocr
-from utilities.content_organizer import organize_content_by_page, generate_documentation_section, format_page_wise_content
+from utilities.content_organizer import organize_content_by_page, generate_documentation_section, iter_page_wise_content
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Progress messages go through logging so concurrent jobs do not contend on
+# stdout; set LOGLEVEL=WARNING to silence them in production
+logging.getLogger().setLevel(os.environ.get('LOGLEVEL', 'INFO'))
+logger = logging.getLogger(__name__)
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson's C encoder"""
+    
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj).decode('utf-8')
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        # Hand orjson's bytes straight to the response, skipping the str round trip
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype='application/json')
 
 app = Flask(__name__)
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # Configuration
 UPLOAD_FOLDER = 'uploads'
 OUTPUT_FOLDER = 'output'
 STATIC_FOLDER = 'static'
+RESULT_CACHE_FOLDER = os.path.join(OUTPUT_FOLDER, 'cache')  # processed outputs keyed by PDF content hash
+TABLES_FOLDER = os.path.join(OUTPUT_FOLDER, 'tables')  # CSV sidecars for large extracted tables
 MAX_FILE_SIZE = 50 * 1024 * 1024  # 50MB
 ALLOWED_EXTENSIONS = {'pdf'}
+ALLOWED_SUFFIXES = tuple(f'.{ext}' for ext in ALLOWED_EXTENSIONS)
+STAGE_WORKERS = min(os.cpu_count() or 1, 4)
+LISTING_CACHE_TTL = 2  # seconds
+OCR_MIN_CHARS_PER_PAGE = 300  # pages with less extractable text than this are OCR'd
+JOB_WORKERS = os.cpu_count() or 1
+UPLOAD_CHUNK_SIZE = 1 << 20  # 1 MiB
+TABLE_CSV_INLINE_LIMIT = 64 * 1024  # larger table CSVs are written to TABLES_FOLDER
+VIEW_INLINE_LIMIT = 1 << 20  # /view inlines outputs up to 1 MiB; larger ones point to /raw
+VIEW_PREVIEW_CHARS = 64 * 1024
+JOB_RESULT_TTL = 3600  # seconds a finished job stays pollable
+# Waitress request threads. The app runs as a single process: the job
+# registry and result caches live in memory, so scale with threads here and
+# with stage_pool workers rather than with extra server processes
+SERVER_THREADS = max(8, (os.cpu_count() or 1) * 2)
 
 # Configure Flask
 app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 app.config['MAX_CONTENT_LENGTH'] = MAX_FILE_SIZE
+# Behind a proxy that honours X-Sendfile, output downloads are handed to the
+# proxy to stream with sendfile(2) instead of being read through Python
+app.config['USE_X_SENDFILE'] = os.environ.get('USE_X_SENDFILE') == '1'
+
+# Absolute output path, resolved once; send_from_directory would otherwise
+# resolve relative folders against the app root instead of the working dir
+OUTPUT_PATH = os.path.abspath(OUTPUT_FOLDER)
 
 # Ensure directories exist
 os.makedirs(UPLOAD_FOLDER, exist_ok=True)
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
+os.makedirs(RESULT_CACHE_FOLDER, exist_ok=True)
+os.makedirs(TABLES_FOLDER, exist_ok=True)
 os.makedirs(STATIC_FOLDER, exist_ok=True)
 os.makedirs(os.path.join(STATIC_FOLDER, 'css'), exist_ok=True)
 os.makedirs(os.path.join(STATIC_FOLDER, 'js'), exist_ok=True)
 
+def _new_stage_pool():
+    """
+    Worker pool for the independent extraction stages. Workers start from a
+    fork server (spawn where that is unavailable) rather than by forking this
+    multi-threaded process, where a child could inherit a lock held by another thread
+    """
+    start_method = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+    return ProcessPoolExecutor(max_workers=STAGE_WORKERS,
+                               mp_context=multiprocessing.get_context(start_method))
+
+# Shared worker pool, reused across requests so workers are only started once;
+# replaced if a worker dies (see _replace_broken_stage_pool)
+stage_pool = _new_stage_pool()
+stage_pool_lock = threading.Lock()
+
+def _replace_broken_stage_pool(broken_pool):
+    """
+    Swap in a fresh stage pool after a worker crashed or was killed; a broken
+    pool would otherwise fail every later upload until a restart
+    """
+    global stage_pool
+    with stage_pool_lock:
+        if stage_pool is broken_pool:
+            stage_pool = _new_stage_pool()
+            logger.warning("Stage worker pool broke; started a new one")
+    broken_pool.shutdown(wait=False, cancel_futures=True)
+
+# Background processing jobs submitted by /store, keyed by job id. Jobs run
+# on threads since the CPU-bound stages are already offloaded to stage_pool
+job_pool = ThreadPoolExecutor(max_workers=JOB_WORKERS)
+jobs = {}
+job_finished_at = {}  # job id -> time.monotonic() when its future finished
+jobs_lock = threading.Lock()
+
+def _mark_job_finished(job_id):
+    """Done-callback for job futures: start the job's expiry clock"""
+    with jobs_lock:
+        if job_id in jobs:
+            job_finished_at[job_id] = time.monotonic()
+
+def _evict_expired_jobs():
+    """Forget jobs that finished more than JOB_RESULT_TTL ago; call with jobs_lock held"""
+    cutoff = time.monotonic() - JOB_RESULT_TTL
+    for job_id in [job_id for job_id, finished in job_finished_at.items() if finished < cutoff]:
+        del job_finished_at[job_id]
+        jobs.pop(job_id, None)
+
+def _sortable_id():
+    """Unique id whose hex timestamp prefix sorts lexicographically by creation time"""
+    return f"{time.time_ns():016x}-{uuid.uuid4().hex[:12]}"
+
 def allowed_file(filename):
     """Check if file extension is allowed"""
-    return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
+    return filename.lower().endswith(ALLOWED_SUFFIXES)
+
+def _listing_cache_key(folder):
+    """Cache key for a folder listing: changes when entries are added or removed, or the TTL expires"""
+    return os.stat(folder).st_mtime_ns, int(time.monotonic() // LISTING_CACHE_TTL)
+
+def _iter_files(folder, suffix):
+    """Yield DirEntry objects for regular files in folder ending with suffix"""
+    with os.scandir(folder) as it:
+        for entry in it:
+            if entry.name.endswith(suffix) and entry.is_file(follow_symlinks=False):
+                yield entry
+
+def _count_files(folder, suffix):
+    """Count files in folder ending with suffix"""
+    return sum(1 for _ in _iter_files(folder, suffix))
+
+# File counts reported by /status: seeded with one scan at startup, then
+# kept up to date as this process adds uploads and outputs
+file_counts = {
+    'uploads': _count_files(UPLOAD_FOLDER, '.pdf'),
+    'outputs': _count_files(OUTPUT_FOLDER, '.txt'),
+}
+file_counts_lock = threading.Lock()
+
+def _count_new_file(kind):
+    """Record a file newly added to the uploads or outputs folder"""
+    with file_counts_lock:
+        file_counts[kind] += 1
+
+def _scan_outputs():
+    """Collect output file details, newest first"""
+    # Get all .txt files in output directory, stat'ing each entry once
+    entries = [(entry.name, entry.stat(follow_symlinks=False))
+               for entry in _iter_files(OUTPUT_FOLDER, '.txt')]
+    
+    # Sort by creation time (newest first) on the raw timestamps
+    entries.sort(key=lambda item: item[1].st_ctime, reverse=True)
+    
+    return [{
+        'filename': name,
+        'size': file_stats.st_size,
+        'created': datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
+        'modified': datetime.fromtimestamp(file_stats.st_mtime).isoformat(),
+        'download_url': f'/output/{name}'
+    } for name, file_stats in entries]
+
+@lru_cache(maxsize=4)
+def _outputs_payload(cache_key):
+    """Serialized /output response body (cached per listing key)"""
+    output_files = _scan_outputs()
+    payload = {
+        'success': True,
+        'total_files': len(output_files),
+        'files': output_files
+    }
+    # orjson already produces UTF-8 bytes; skip the str round trip
+    if orjson is not None:
+        return orjson.dumps(payload)
+    return app.json.dumps(payload).encode('utf-8')
+
+def _pages_needing_ocr(text_data):
+    """
+    Decide which pages need OCR from the extracted text layer.
+    Returns [] when the text layer is rich enough to skip OCR, a list of
+    0-based page indices with sparse text, or None if per-page counts are unknown.
+    """
+    char_counts = text_data.get('page_char_counts')
+    if not char_counts:
+        return None
+    if sum(char_counts) / len(char_counts) > OCR_MIN_CHARS_PER_PAGE:
+        return []
+    return [i for i, count in enumerate(char_counts) if count < OCR_MIN_CHARS_PER_PAGE]
+
+def _join_stages(futures, siblings=()):
+    """
+    Wait for extraction stage futures, failing fast: if any stage raises,
+    cancel the stages (including siblings) that have not started and re-raise.
+    """
+    done, pending = wait(futures, return_when=FIRST_EXCEPTION)
+    for future in done:
+        if future.exception() is not None:
+            for other in (*pending, *siblings):
+                other.cancel()
+            raise future.exception()
+    return [future.result() for future in futures]
 
 # Update the process_pdf function in main.py
 
 def process_pdf(pdf_path, filename):
     """Enhanced PDF processing with warning suppression for research papers"""
+    processed_at = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    # One pool for the whole upload, so a pool broken mid-run is the one replaced
+    pool = stage_pool
     try:
-        print(f"Processing {filename}...")
-        
-        # Suppress warnings during processing
-        with warnings.catch_warnings():
-            warnings.simplefilter("ignore")
-            
-            # Initialize results dictionary
-            results = {
-                'filename': filename,
-                'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'text_content': '',
-                'structure': {},
-                'images': [],
-                'tables': [],
-                'metadata': {},
-                'ocr_text': '',
-                'organized_content': {},
-                'document_type': 'research_paper'  # Explicitly set for research papers
-            }
-            
-            # Step 1: Validate PDF
-            validation_result = validate_pdf(pdf_path)
-            if not validation_result['valid']:
-                results['error'] = validation_result['error']
-                return results
-            
-            # Step 2: Extract text and structure (with warning suppression)
-            print("Extracting text and structure...")
-            text_data = extract_text_and_structure(pdf_path)
-            results['text_content'] = text_data.get('text', '')
-            results['structure'] = text_data.get('structure', {})
-            
-            # Step 3: Extract images (with warning suppression)
-            print("Extracting images...")
-            images_data = extract_images(pdf_path)
-            results['images'] = images_data
-            
-            # Step 4: Extract tables (with enhanced error handling)
-            print("Extracting tables...")
-            tables_data = extract_tables_with_fallback(pdf_path)
-            results['tables'] = tables_data
-            
-            # Step 5: Extract metadata
-            print("Extracting metadata...")
-            metadata = extract_metadata(pdf_path)
-            results['metadata'] = metadata
-            
-            # Step 6: Perform OCR if needed
-            print("Performing OCR...")
-            ocr_text = perform_ocr(pdf_path)
-            results['ocr_text'] = ocr_text
-            
-            # Step 7: Organize content by page
-            print("Organizing content by page...")
-            organized_content = organize_content_by_page(
-                pdf_path,
-                text_data,
-                images_data,
-                tables_data,
-                metadata
-            )
-            results['organized_content'] = organized_content
-            
+        logger.info("Processing %s...", filename)
+        
+        # Initialize results dictionary
+        results = {
+            'filename': filename,
+            'processed_at': processed_at,
+            'text_content': '',
+            'structure': {},
+            'images': [],
+            'tables': [],
+            'metadata': {},
+            'ocr_text': '',
+            'organized_content': {},
+            'document_type': 'research_paper'  # Explicitly set for research papers
+        }
+        
+        # Step 1: Validate PDF
+        validation_result = validate_pdf(pdf_path)
+        if not validation_result['valid']:
+            results['error'] = validation_result['error']
             return results
         
+        # Steps 2-5: text, images and tables each read the PDF
+        # independently, so run them in parallel worker processes
+        logger.info("Extracting text, images and tables in parallel...")
+        fut_text = pool.submit(extract_text_and_structure, pdf_path)
+        fut_images = pool.submit(extract_images, pdf_path)
+        fut_tables = pool.submit(extract_tables_with_fallback, pdf_path)
+        
+        # Metadata extraction is cheap, run it inline while workers are busy
+        logger.info("Extracting metadata...")
+        metadata = extract_metadata(pdf_path)
+        results['metadata'] = metadata
+        
+        text_data, = _join_stages([fut_text], siblings=(fut_images, fut_tables))
+        results['text_content'] = text_data.get('text', '')
+        results['structure'] = text_data.get('structure', {})
+        
+        # Step 6: OCR only pages the text layer does not cover; born-digital
+        # PDFs skip it entirely. Runs alongside image/table extraction
+        ocr_pages = _pages_needing_ocr(text_data)
+        stage_futures = [fut_images, fut_tables]
+        if ocr_pages != []:
+            logger.info("Performing OCR...")
+            stage_futures.append(pool.submit(perform_ocr, pdf_path, ocr_pages))
+        
+        images_data, tables_data, *ocr_result = _join_stages(stage_futures)
+        results['images'] = images_data
+        results['tables'] = tables_data
+        
+        ocr_text = ocr_result[0] if ocr_result else ''
+        results['ocr_text'] = ocr_text
+        
+        # Step 7: Organize content by page
+        logger.info("Organizing content by page...")
+        organized_content = organize_content_by_page(
+            pdf_path,
+            text_data,
+            images_data,
+            tables_data,
+            metadata
+        )
+        results['organized_content'] = organized_content
+        
+        return results
+    
+    except BrokenProcessPool as e:
+        _replace_broken_stage_pool(pool)
+        return {
+            'filename': filename,
+            'error': f"Processing failed: a worker process died ({str(e)})",
+            'processed_at': processed_at
+        }
+    
     except Exception as e:
         return {
             'filename': filename,
             'error': f"Processing failed: {str(e)}",
-            'processed_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            'processed_at': processed_at
         }
 
 def extract_tables_with_fallback(pdf_path):
     """Enhanced table extraction with fallback methods for research papers"""
     try:
-        # Import here to avoid circular imports
-        from utilities.table_extractor import extract_tables
-        
-        # Suppress specific camelot warnings
-        with warnings.catch_warnings():
-            warnings.filterwarnings("ignore", module="camelot")
-            warnings.filterwarnings("ignore", message=".*does not lie in column range.*")
-            
-            tables_data = extract_tables(pdf_path)
-            
-            # If no tables found or all failed, try alternative approach
-            if not tables_data or all('error' in table for table in tables_data if isinstance(table, dict)):
-                print("Primary table extraction failed, trying alternative method...")
-                tables_data = extract_tables_alternative(pdf_path)
-            
-            return tables_data
-            
+        tables_data = extract_tables(pdf_path)
+        
+        # If no tables found or all failed, try alternative approach
+        if not tables_data or all('error' in table for table in tables_data if isinstance(table, dict)):
+            logger.info("Primary table extraction failed, trying alternative method...")
+            tables_data = extract_tables_alternative(pdf_path)
+        
+        return tables_data
+        
     except Exception as e:
-        print(f"Table extraction error: {str(e)}")
+        logger.warning("Table extraction error: %s", e)
         return [{'error': f'Table extraction failed: {str(e)}'}]
 
+# pdfplumber settings tuned for ruled tables in research papers
+ALTERNATIVE_TABLE_SETTINGS = {
+    "vertical_strategy": "lines_strict",
+    "horizontal_strategy": "lines_strict",
+    "explicit_vertical_lines": [],
+    "explicit_horizontal_lines": [],
+    "snap_tolerance": 3,
+    "join_tolerance": 3,
+    "edge_min_length": 3,
+    "min_words_vertical": 3,
+    "min_words_horizontal": 1,
+    "keep_blank_chars": False,
+    "text_tolerance": 3,
+    "text_tolerance_ratio": None
+}
+
+# Pages per fallback table-extraction task: each task opens the PDF once, so
+# blocks amortize the open; documents of one block or less run inline
+ALT_TABLE_PAGE_BLOCK = 8
+
+def _extract_pages(pdf, start, stop, settings):
+    """Extract tables from pages [start, stop) of an open pdfplumber document"""
+    page_results = []
+    for page_idx in range(start, stop):
+        try:
+            page_results.append((page_idx, pdf.pages[page_idx].extract_tables(table_settings=settings)))
+        except Exception as e:
+            logger.warning("Alternative table extraction failed on page %d: %s", page_idx + 1, e)
+    return page_results
+
+def _extract_page_block(pdf_path, start, stop, settings):
+    """Extract tables from a contiguous page block; runs in a worker process"""
+    import pdfplumber
+    
+    with pdfplumber.open(pdf_path) as pdf:
+        return _extract_pages(pdf, start, stop, settings)
+
+def _table_to_csv(table):
+    """Render a pdfplumber table (list of rows) as CSV text"""
+    buf = io.StringIO()
+    csv.writer(buf).writerows(table)
+    return buf.getvalue()
+
 def extract_tables_alternative(pdf_path):
     """Alternative table extraction method for complex research papers"""
     try:
         import pdfplumber
         
-        tables = []
+        page_results = []
         with pdfplumber.open(pdf_path) as pdf:
-            for page_num, page in enumerate(pdf.pages, 1):
-                try:
-                    # Extract tables with different settings for research papers
-                    page_tables = page.extract_tables(table_settings={
-                        "vertical_strategy": "lines_strict",
-                        "horizontal_strategy": "lines_strict",
-                        "explicit_vertical_lines": [],
-                        "explicit_horizontal_lines": [],
-                        "snap_tolerance": 3,
-                        "join_tolerance": 3,
-                        "edge_min_length": 3,
-                        "min_words_vertical": 3,
-                        "min_words_horizontal": 1,
-                        "keep_blank_chars": False,
-                        "text_tolerance": 3,
-                        "text_tolerance_ratio": None
-                    })
+            page_count = len(pdf.pages)
+            if page_count <= ALT_TABLE_PAGE_BLOCK:
+                # Short documents: a worker pool would cost more than it saves
+                page_results = _extract_pages(pdf, 0, page_count, ALTERNATIVE_TABLE_SETTINGS)
+        
+        if page_count > ALT_TABLE_PAGE_BLOCK:
+            # Page blocks are independent, so extract them in parallel; each
+            # worker opens its own handle since pdfplumber documents are not
+            # shareable. This already runs inside a stage_pool worker, so the
+            # nested pool is kept small
+            blocks = [(start, min(start + ALT_TABLE_PAGE_BLOCK, page_count))
+                      for start in range(0, page_count, ALT_TABLE_PAGE_BLOCK)]
+            with ProcessPoolExecutor(max_workers=min(len(blocks), os.cpu_count() or 1, 4)) as executor:
+                futures = [
+                    executor.submit(_extract_page_block, pdf_path, start, stop, ALTERNATIVE_TABLE_SETTINGS)
+                    for start, stop in blocks
+                ]
+                for (start, stop), future in zip(blocks, futures):
+                    try:
+                        page_results.extend(future.result())
+                    except Exception as e:
+                        logger.warning("Alternative table extraction failed on pages %d-%d: %s", start + 1, stop, e)
+        
+        pdf_stem = os.path.splitext(os.path.basename(pdf_path))[0]
+        tables = []
+        for page_idx, page_tables in sorted(page_results, key=lambda r: r[0]):
+            for i, table in enumerate(page_tables):
+                if table and len(table) > 1:  # Must have header + at least one row
+                    table_info = {
+                        'page': page_idx + 1,
+                        'table_index': i + 1,
+                        'content': _table_to_csv(table),
+                        'rows': len(table),
+                        'columns': len(table[0]) if table else 0,
+                        'method': 'pdfplumber_alternative',
+                        'accuracy': 85.0  # Estimated accuracy
+                    }
+                    
+                    # Keep very large tables out of the in-memory results and output text
+                    if len(table_info['content']) > TABLE_CSV_INLINE_LIMIT:
+                        content_path = os.path.join(TABLES_FOLDER, f"{pdf_stem}_p{page_idx + 1}_t{i + 1}.csv")
+                        with open(content_path, 'w', encoding='utf-8', newline='') as f:
+                            f.write(table_info['content'])
+                        table_info['content_path'] = content_path
+                        table_info['content'] = table_info['content'][:200]  # preview only
                     
-                    for i, table in enumerate(page_tables):
-                        if table and len(table) > 1:  # Must have header + at least one row
-                            tables.append({
-                                'page': page_num,
-                                'table_index': i + 1,
-                                'content': str(table),
-                                'rows': len(table),
-                                'columns': len(table[0]) if table else 0,
-                                'method': 'pdfplumber_alternative',
-                                'accuracy': 85.0  # Estimated accuracy
-                            })
-                            
-                except Exception as e:
-                    print(f"Alternative table extraction failed on page {page_num}: {str(e)}")
-                    continue
+                    tables.append(table_info)
         
         return tables if tables else [{'info': 'No tables detected with alternative method'}]
         
     except Exception as e:
         return [{'error': f'Alternative table extraction failed: {str(e)}'}]
 
-def generate_enhanced_output_text(results):
-    """Generate enhanced output with document type classification"""
-    output_lines = []
+# Section rules shared by every report, built once rather than per output
+SECTION_RULE = "=" * 50
+SUMMARY_RULE = "=" * 40
+SUBSECTION_RULE = "-" * 25
+
+def _build_book_section(type_specific):
+    """Type-specific analysis lines for books"""
+    lines = []
+    append = lines.append
+    append(f"BOOK STRUCTURE ANALYSIS:\n{SUBSECTION_RULE}")
+    
+    # Table of Contents
+    toc = type_specific.get('table_of_contents', [])
+    if toc:
+        append(f"Table of Contents ({len(toc)} entries):")
+        append("\n".join(
+            f"  {entry.get('level', 1)*'  '}{entry.get('title', '')} ... Page {entry.get('page', 'N/A')}"
+            for entry in toc[:10]  # First 10 entries
+        ))
+        if len(toc) > 10:
+            append(f"  ... and {len(toc) - 10} more entries")
+    
+    # Chapters
+    chapters = type_specific.get('chapters', [])
+    if chapters:
+        append(f"\nChapters ({len(chapters)} found):")
+        append("\n".join(
+            f"  Chapter {chapter.get('chapter_number', 'N/A')}: {chapter.get('title', '')}\n"
+            f"    Pages: {chapter.get('start_page', 'N/A')}-{chapter.get('end_page', 'N/A')}\n"
+            f"    Word Count: {chapter.get('word_count', 'N/A')}"
+            for chapter in chapters[:5]  # First 5 chapters
+        ))
+    
+    return lines
+
+def _build_paper_section(type_specific):
+    """Type-specific analysis lines for research papers"""
+    lines = []
+    append = lines.append
+    append(f"RESEARCH PAPER ANALYSIS:\n{SUBSECTION_RULE}")
+    
+    # Abstract
+    abstract = type_specific.get('abstract', {})
+    if abstract.get('present'):
+        append(
+            "Abstract:\n"
+            f"  Content: {abstract.get('content', '')[:200]}...\n"
+            f"  Word Count: {abstract.get('word_count', 'N/A')}"
+        )
     
+    # Authors
+    authors = type_specific.get('authors', [])
+    if authors:
+        append(f"\nAuthors: {', '.join(author.get('name', '') for author in authors[:5])}")
+    
+    # Sections
+    sections = type_specific.get('sections', [])
+    if sections:
+        append(f"\nPaper Sections ({len(sections)} found):")
+        append("\n".join(
+            f"  {section.get('title', '')} ({section.get('word_count', 'N/A')} words)"
+            for section in sections
+        ))
+    
+    # References
+    references = type_specific.get('references', {})
+    if references.get('present'):
+        append(f"\nReferences: {references.get('count', 'N/A')} citations found")
+    
+    return lines
+
+def _build_tech_report_section(type_specific):
+    """Type-specific analysis lines for technical reports"""
+    lines = []
+    append, extend = lines.append, lines.extend
+    append(f"TECHNICAL REPORT ANALYSIS:\n{SUBSECTION_RULE}")
+    
+    # Executive Summary
+    exec_summary = type_specific.get('executive_summary', {})
+    if exec_summary.get('present'):
+        append(
+            "Executive Summary:\n"
+            f"  Content: {exec_summary.get('content', '')[:200]}...\n"
+            f"  Word Count: {exec_summary.get('word_count', 'N/A')}"
+        )
+    
+    # Recommendations
+    recommendations = type_specific.get('recommendations', {})
+    if recommendations.get('present'):
+        append(f"\nRecommendations ({recommendations.get('count', 'N/A')} found):")
+        extend(
+            f"  {i}. {rec[:100]}..."
+            for i, rec in enumerate(recommendations.get('recommendations', [])[:3], 1)
+        )
+    
+    # Technical Specifications
+    tech_specs = type_specific.get('technical_specifications', {})
+    if tech_specs.get('count', 0) > 0:
+        append(f"\nTechnical Specifications: {tech_specs.get('count', 'N/A')} found")
+    
+    return lines
+
+def _build_generic_section(type_specific):
+    """No type-specific analysis for unclassified documents"""
+    return []
+
+# Type-specific section builders, dispatched on the classified document type
+SECTION_BUILDERS = {
+    'book': _build_book_section,
+    'research_paper': _build_paper_section,
+    'technical_report': _build_tech_report_section,
+}
+
+def _iter_output_lines(results):
+    """Yield the enhanced output with document type classification, one section at a time"""
     # Error handling
     if 'error' in results:
         # ... existing error handling code ...
-        return "\n".join(output_lines)
+        return
     
     # 1. DOCUMENTATION SECTION (Enhanced with document type)
     classification = results.get('document_classification', {})
@@ -235,149 +602,167 @@ The content is organized as follows:
 4. OCR Analysis
 5. Processing Summary
 """
-    output_lines.append(doc_section.strip())
-    output_lines.append("\n\n")
+    yield doc_section.strip() + "\n\n\n"
     
     # 2. DOCUMENT METADATA AND CLASSIFICATION (Enhanced)
-    output_lines.append("DOCUMENT METADATA AND CLASSIFICATION")
-    output_lines.append("=" * 50)
-    
-    # Classification details
-    output_lines.append("DOCUMENT TYPE CLASSIFICATION:")
-    output_lines.append(f"Primary Type: {doc_type.title()}")
-    output_lines.append(f"Confidence: {confidence:.1%}")
-    
     scores = classification.get('scores', {})
-    for doc_type_name, score in scores.items():
-        output_lines.append(f"{doc_type_name.title()} Score: {score:.2f}")
-    
-    output_lines.append("")
+    score_lines = "".join(f"\n{name.title()} Score: {score:.2f}" for name, score in scores.items())
+    metadata_section = (
+        "DOCUMENT METADATA AND CLASSIFICATION\n"
+        f"{SECTION_RULE}\n"
+        "DOCUMENT TYPE CLASSIFICATION:\n"
+        f"Primary Type: {doc_type.title()}\n"
+        f"Confidence: {confidence:.1%}{score_lines}\n"
+    )
     
     # Original metadata
     if results.get('metadata'):
-        formatted_metadata = format_metadata_for_display(results['metadata'])
-        output_lines.append("DOCUMENT METADATA:")
-        output_lines.append(formatted_metadata)
-    output_lines.append("\n\n")
+        metadata_section += f"\nDOCUMENT METADATA:\n{format_metadata_for_display(results['metadata'])}"
+    yield metadata_section + "\n\n\n"
     
     # 3. TYPE-SPECIFIC CONTENT ANALYSIS (NEW MAJOR SECTION)
-    output_lines.append("TYPE-SPECIFIC CONTENT ANALYSIS")
-    output_lines.append("=" * 50)
+    type_lines = ["TYPE-SPECIFIC CONTENT ANALYSIS", SECTION_RULE]
     
     type_specific = results.get('organized_content', {}).get('type_specific_content', {})
     if type_specific and 'error' not in type_specific:
-        
-        if doc_type == 'book':
-            output_lines.append("BOOK STRUCTURE ANALYSIS:")
-            output_lines.append("-" * 25)
-            
-            # Table of Contents
-            toc = type_specific.get('table_of_contents', [])
-            if toc:
-                output_lines.append(f"Table of Contents ({len(toc)} entries):")
-                for entry in toc[:10]:  # First 10 entries
-                    output_lines.append(f"  {entry.get('level', 1)*'  '}{entry.get('title', '')} ... Page {entry.get('page', 'N/A')}")
-                if len(toc) > 10:
-                    output_lines.append(f"  ... and {len(toc) - 10} more entries")
-            
-            # Chapters
-            chapters = type_specific.get('chapters', [])
-            if chapters:
-                output_lines.append(f"\nChapters ({len(chapters)} found):")
-                for chapter in chapters[:5]:  # First 5 chapters
-                    output_lines.append(f"  Chapter {chapter.get('chapter_number', 'N/A')}: {chapter.get('title', '')}")
-                    output_lines.append(f"    Pages: {chapter.get('start_page', 'N/A')}-{chapter.get('end_page', 'N/A')}")
-                    output_lines.append(f"    Word Count: {chapter.get('word_count', 'N/A')}")
-        
-        elif doc_type == 'research_paper':
-            output_lines.append("RESEARCH PAPER ANALYSIS:")
-            output_lines.append("-" * 25)
-            
-            # Abstract
-            abstract = type_specific.get('abstract', {})
-            if abstract.get('present'):
-                output_lines.append("Abstract:")
-                output_lines.append(f"  Content: {abstract.get('content', '')[:200]}...")
-                output_lines.append(f"  Word Count: {abstract.get('word_count', 'N/A')}")
-            
-            # Authors
-            authors = type_specific.get('authors', [])
-            if authors:
-                author_names = [author.get('name', '') for author in authors[:5]]
-                output_lines.append(f"\nAuthors: {', '.join(author_names)}")
-            
-            # Sections
-            sections = type_specific.get('sections', [])
-            if sections:
-                output_lines.append(f"\nPaper Sections ({len(sections)} found):")
-                for section in sections:
-                    output_lines.append(f"  {section.get('title', '')} ({section.get('word_count', 'N/A')} words)")
-            
-            # References
-            references = type_specific.get('references', {})
-            if references.get('present'):
-                output_lines.append(f"\nReferences: {references.get('count', 'N/A')} citations found")
-        
-        elif doc_type == 'technical_report':
-            output_lines.append("TECHNICAL REPORT ANALYSIS:")
-            output_lines.append("-" * 25)
-            
-            # Executive Summary
-            exec_summary = type_specific.get('executive_summary', {})
-            if exec_summary.get('present'):
-                output_lines.append("Executive Summary:")
-                output_lines.append(f"  Content: {exec_summary.get('content', '')[:200]}...")
-                output_lines.append(f"  Word Count: {exec_summary.get('word_count', 'N/A')}")
-            
-            # Recommendations
-            recommendations = type_specific.get('recommendations', {})
-            if recommendations.get('present'):
-                output_lines.append(f"\nRecommendations ({recommendations.get('count', 'N/A')} found):")
-                for i, rec in enumerate(recommendations.get('recommendations', [])[:3], 1):
-                    output_lines.append(f"  {i}. {rec[:100]}...")
-            
-            # Technical Specifications
-            tech_specs = type_specific.get('technical_specifications', {})
-            if tech_specs.get('count', 0) > 0:
-                output_lines.append(f"\nTechnical Specifications: {tech_specs.get('count', 'N/A')} found")
-    
-    output_lines.append("\n\n")
-    
-    # 4. PAGE-WISE CONTENT ANALYSIS
-    output_lines.append("\n\nPAGE-WISE CONTENT ANALYSIS")
-    output_lines.append("=" * 50)
+        builder = SECTION_BUILDERS.get(doc_type, _build_generic_section)
+        type_lines.extend(builder(type_specific))
+    
+    type_lines.append("\n\n")
+    yield "\n".join(type_lines)
+    
+    # 4. PAGE-WISE CONTENT ANALYSIS, streamed a page block at a time
     org = results.get('organized_content', {})
     if org and 'page_content' in org:
-        output_lines.append(format_page_wise_content(
+        page_wise = iter_page_wise_content(
             org['page_content'],
             org.get('total_pages', 0)
-        ))
+        )
+        yield f"\n\nPAGE-WISE CONTENT ANALYSIS\n{SECTION_RULE}\n{next(page_wise)}"
+        yield from page_wise
     else:
-        output_lines.append("No page-wise content available.")
+        yield f"\n\nPAGE-WISE CONTENT ANALYSIS\n{SECTION_RULE}\nNo page-wise content available."
 
     # 5. OCR EXTRACTED TEXT
-    output_lines.append("\n\nOCR EXTRACTED TEXT")
-    output_lines.append("=" * 40)
     ocr = results.get('ocr_text', '').strip()
-    output_lines.append(ocr if ocr else "No OCR text extracted.")
+    yield f"\n\nOCR EXTRACTED TEXT\n{SUMMARY_RULE}\n{ocr if ocr else 'No OCR text extracted.'}"
 
     # 6. PROCESSING SUMMARY
-    output_lines.append("\n\nPROCESSING SUMMARY")
-    output_lines.append("=" * 40)
-    summary = [
-        f"Document: {results['filename']}",
-        f"Processed at: {results['processed_at']}",
-        f"Total Pages: {org.get('total_pages', 'Unknown')}",
-        f"Text Characters: {len(results.get('text_content',''))}",
-        f"Images Found: {len(results.get('images', []))}",
-        f"Tables Found: {len(results.get('tables', []))}",
-        f"OCR Characters: {len(ocr)}"
-    ]
-    output_lines.extend(summary)
+    yield f"""
+
+PROCESSING SUMMARY
+{SUMMARY_RULE}
+Document: {results['filename']}
+Processed at: {results['processed_at']}
+Total Pages: {org.get('total_pages', 'Unknown')}
+Text Characters: {len(results.get('text_content',''))}
+Images Found: {len(results.get('images', []))}
+Tables Found: {len(results.get('tables', []))}
+OCR Characters: {len(ocr)}"""
+
+def generate_enhanced_output_text(results):
+    """Generate enhanced output with document type classification"""
+    return "\n".join(_iter_output_lines(results))
+
+def write_enhanced_output(results, output_path):
+    """Stream the enhanced output to disk without building the full text in memory"""
+    with open(output_path, 'w', encoding='utf-8', buffering=1 << 20) as f:
+        f.writelines(f"{line}\n" for line in _iter_output_lines(results))
+
+
+
+def _save_upload(file, file_path):
+    """Save an uploaded file to disk, returning the SHA-256 hex digest of its content"""
+    hasher = hashlib.sha256()
+    # One reusable buffer for the whole copy; hashing and writing share each chunk
+    buf = bytearray(UPLOAD_CHUNK_SIZE)
+    view = memoryview(buf)
+    with open(file_path, 'wb') as dst:
+        while n := file.stream.readinto(buf):
+            chunk = view[:n]
+            hasher.update(chunk)
+            dst.write(chunk)
+    return hasher.hexdigest()
 
-    return "\n".join(output_lines)
+def _output_filename(original_filename):
+    """Name of the processed output file for an uploaded PDF"""
+    return f"{os.path.splitext(original_filename)[0]}_processed.txt"
 
+def _cached_results_path(content_hash):
+    """Location of the cached processing results for a PDF content hash"""
+    # Pickled: results hold DataFrames and other non-JSON values, and the
+    # cache folder is only ever written by this process
+    return os.path.join(RESULT_CACHE_FOLDER, f"{content_hash}.results.pickle")
 
+def _cached_meta_path(content_hash):
+    """Location of the cached job result for a PDF content hash; written last, so it marks a complete entry"""
+    return os.path.join(RESULT_CACHE_FOLDER, f"{content_hash}.meta.json")
+
+def _write_cache_file(path, mode, dump, **open_kwargs):
+    """
+    Write a cache file through a temporary file in the cache folder and
+    rename it into place, so readers never see a partially written entry
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=RESULT_CACHE_FOLDER, suffix='.tmp')
+    try:
+        with open(fd, mode, **open_kwargs) as f:
+            dump(f)
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+def _write_output(results, original_filename):
+    """Stream enhanced output text to the upload's output file, returning its name"""
+    output_filename = _output_filename(original_filename)
+    output_path = os.path.join(OUTPUT_FOLDER, output_filename)
+    is_new_output = not os.path.exists(output_path)
+    write_enhanced_output(results, output_path)
+    if is_new_output:
+        _count_new_file('outputs')
+    return output_filename
+
+def _rebind_cached_results(results, file_path, original_filename):
+    """
+    Point cached results at the current upload: only the content-derived
+    parts are reused, while its name, processing time and file-system
+    metadata are taken from this upload
+    """
+    results['filename'] = original_filename
+    results['processed_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+    metadata = results.get('metadata')
+    if isinstance(metadata, dict):
+        # organized_content shares this dict, so both views are updated
+        for key in FILE_METADATA_KEYS:
+            metadata.pop(key, None)
+        metadata.update(extract_file_metadata(file_path))
+    return results
+
+def _process_and_write(file_path, original_filename, content_hash):
+    """Process an uploaded PDF and write its output file; runs as a background job"""
+    results = process_pdf(file_path, original_filename)
+    output_filename = _write_output(results, original_filename)
+    
+    job_result = {
+        'original_filename': original_filename,
+        'output_filename': output_filename,
+        'processing_time': results.get('processed_at'),
+        'has_error': 'error' in results
+    }
+    
+    # Only successful results are cached so failed runs can be retried
+    if 'error' not in results:
+        # The meta file marks a complete entry, so it is renamed into place last
+        _write_cache_file(
+            _cached_results_path(content_hash), 'wb',
+            lambda f: pickle.dump(results, f, protocol=pickle.HIGHEST_PROTOCOL)
+        )
+        _write_cache_file(
+            _cached_meta_path(content_hash), 'w',
+            lambda f: json.dump(job_result, f), encoding='utf-8'
+        )
+    
+    return job_result
 
 # Keep all existing Flask routes unchanged
 @app.route('/')
@@ -387,7 +772,7 @@ def index():
 
 @app.route('/store', methods=['POST'])
 def store_pdf():
-    """Store uploaded PDF and process it"""
+    """Store uploaded PDF and queue it for background processing"""
     try:
         # Check if file is present in request
         if 'file' not in request.files:
@@ -405,66 +790,91 @@ def store_pdf():
         
         # Generate unique filename
         original_filename = secure_filename(file.filename)
-        unique_filename = f"{uuid.uuid4()}_{original_filename}"
+        # Time-ordered prefix: uploads sort by arrival with a plain name sort
+        unique_filename = f"{_sortable_id()}_{original_filename}"
         file_path = os.path.join(app.config['UPLOAD_FOLDER'], unique_filename)
         
-        # Save file
-        file.save(file_path)
-        
-        # Process the PDF
-        results = process_pdf(file_path, original_filename)
-        
-        # Generate enhanced output text (MODIFIED)
-        output_text = generate_enhanced_output_text(results)
+        # Save file under a temporary name, hashing it in the same pass
+        part_path = f"{file_path}.part"
+        content_hash = _save_upload(file, part_path)
+        
+        os.replace(part_path, file_path)
+        _count_new_file('uploads')
+        
+        # Identical PDFs were processed before: reuse the cached results
+        # unless the client asks for a fresh run with ?forceRefresh=1.
+        # Only the output text is rendered again, for this upload
+        meta_path = _cached_meta_path(content_hash)
+        if request.args.get('forceRefresh') != '1' and os.path.exists(meta_path):
+            with open(meta_path, encoding='utf-8') as f:
+                cached_result = json.load(f)
+            with open(_cached_results_path(content_hash), 'rb') as f:
+                results = pickle.load(f)
+            _rebind_cached_results(results, file_path, original_filename)
+            output_filename = _write_output(results, original_filename)
+            return jsonify({
+                'success': True,
+                'message': 'PDF processed successfully (cached result)',
+                **cached_result,
+                'original_filename': original_filename,
+                'output_filename': output_filename,
+                'processing_time': results['processed_at'],
+                'cached': True
+            }), 200
+        
+        # Queue the PDF for processing and return immediately
+        job_id = str(uuid.uuid4())
+        future = job_pool.submit(_process_and_write, file_path, original_filename, content_hash)
+        with jobs_lock:
+            _evict_expired_jobs()
+            jobs[job_id] = future
+        # Registered outside the lock: it runs at once if the job already finished
+        future.add_done_callback(lambda _future: _mark_job_finished(job_id))
         
-        # Save output file
-        output_filename = f"{os.path.splitext(original_filename)[0]}_processed.txt"
-        output_path = os.path.join(OUTPUT_FOLDER, output_filename)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            f.write(output_text)
-        
-        # Return success response with file information
         return jsonify({
             'success': True,
-            'message': 'PDF processed successfully',
+            'message': 'PDF queued for processing',
             'original_filename': original_filename,
-            'output_filename': output_filename,
-            'processing_time': results.get('processed_at'),
-            'has_error': 'error' in results
-        }), 200
+            'job_id': job_id,
+            'status_url': f'/store/{job_id}/status'
+        }), 202
         
     except Exception as e:
         return jsonify({'error': f'Processing failed: {str(e)}'}), 500
 
+@app.route('/store/<job_id>/status')
+def job_status(job_id):
+    """Poll the state of a queued processing job"""
+    with jobs_lock:
+        _evict_expired_jobs()
+        future = jobs.get(job_id)
+    if future is None:
+        return jsonify({'error': 'Unknown job id'}), 404
+    if not future.done():
+        return jsonify({'success': True, 'job_id': job_id, 'status': 'processing'}), 200
+    
+    # Finished jobs can be polled again until they expire after JOB_RESULT_TTL
+    try:
+        job_result = future.result()
+    except Exception as e:
+        return jsonify({'job_id': job_id, 'status': 'failed', 'error': f'Processing failed: {str(e)}'}), 500
+    
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status': 'completed',
+        'message': 'PDF processed successfully',
+        **job_result
+    }), 200
+
 # Keep all other existing routes unchanged
 @app.route('/output')
 def list_outputs():
     """List all processed output files"""
     try:
-        output_files = []
-        # Get all .txt files in output directory
-        txt_files = glob.glob(os.path.join(OUTPUT_FOLDER, '*.txt'))
-        
-        for file_path in txt_files:
-            filename = os.path.basename(file_path)
-            file_stats = os.stat(file_path)
-            output_files.append({
-                'filename': filename,
-                'size': file_stats.st_size,
-                'created': datetime.fromtimestamp(file_stats.st_ctime).isoformat(),
-                'modified': datetime.fromtimestamp(file_stats.st_mtime).isoformat(),
-                'download_url': f'/output/{filename}'
-            })
-        
-        # Sort by creation time (newest first)
-        output_files.sort(key=lambda x: x['created'], reverse=True)
-        
-        return jsonify({
-            'success': True,
-            'total_files': len(output_files),
-            'files': output_files
-        }), 200
+        # Repeated polls reuse the encoded body until the folder changes
+        payload = _outputs_payload(_listing_cache_key(OUTPUT_FOLDER))
+        return app.response_class(payload, mimetype='application/json'), 200
         
     except Exception as e:
         return jsonify({'error': f'Failed to list output files: {str(e)}'}), 500
@@ -473,18 +883,11 @@ def list_outputs():
 def download_output(filename):
     """Download specific output file"""
     try:
-        safe_filename = secure_filename(filename)
-        file_path = os.path.join(os.getcwd(), OUTPUT_FOLDER, safe_filename)
-        
-        if not os.path.exists(file_path):
-            abort(404)
-        
-        return send_from_directory(
-            os.path.join(os.getcwd(), OUTPUT_FOLDER),
-            safe_filename,
-            as_attachment=True
-        )
+        # send_from_directory does its own existence check and raises NotFound
+        return send_from_directory(OUTPUT_PATH, secure_filename(filename), as_attachment=True)
         
+    except NotFound:
+        raise
     except Exception as e:
         return jsonify({'error': f'Failed to download file: {str(e)}'}), 500
 
@@ -497,9 +900,25 @@ def view_output(filename):
         
         # Check if file exists
         file_path = os.path.join(OUTPUT_FOLDER, safe_filename)
-        if not os.path.exists(file_path):
+        if not os.path.isfile(file_path):
             abort(404)
         
+        # Large outputs are not loaded into memory: send a preview and
+        # point the client at the streamed plain-text endpoint
+        file_size = os.path.getsize(file_path)
+        if file_size > VIEW_INLINE_LIMIT:
+            with open(file_path, 'r', encoding='utf-8') as f:
+                preview = f.read(VIEW_PREVIEW_CHARS)
+            return jsonify({
+                'success': True,
+                'filename': safe_filename,
+                'content': preview,
+                'content_length': len(preview),
+                'truncated': True,
+                'file_size': file_size,
+                'raw_url': f'/output/{safe_filename}/raw'
+            }), 200
+        
         # Read file content
         with open(file_path, 'r', encoding='utf-8') as f:
             content = f.read()
@@ -511,15 +930,24 @@ def view_output(filename):
             'content_length': len(content)
         }), 200
         
+    except NotFound:
+        raise
     except Exception as e:
         return jsonify({'error': f'Failed to read file: {str(e)}'}), 500
 
+@app.route('/output/<filename>/raw')
+def view_output_raw(filename):
+    """Serve output file content as plain text, letting Werkzeug sendfile it"""
+    safe_filename = secure_filename(filename)
+    return send_from_directory(OUTPUT_PATH, safe_filename, mimetype='text/plain')
+
 @app.route('/status')
 def status():
     """Get system status"""
     try:
-        upload_count = len(glob.glob(os.path.join(UPLOAD_FOLDER, '*.pdf')))
-        output_count = len(glob.glob(os.path.join(OUTPUT_FOLDER, '*.txt')))
+        with file_counts_lock:
+            upload_count = file_counts['uploads']
+            output_count = file_counts['outputs']
         
         return jsonify({
             'success': True,
@@ -542,12 +970,23 @@ if __name__ == '__main__':
     print(f"Output folder: {os.path.abspath(OUTPUT_FOLDER)}")
     print("Available endpoints:")
     print(" GET / - Main drag-and-drop interface")
-    print(" POST /store - Upload and process PDF")
+    print(" POST /store - Upload PDF and queue it for processing")
+    print(" GET /store/<job_id>/status - Poll a processing job")
     print(" GET /output - List all output files")
     print(" GET /output/<filename> - Download output file")
     print(" GET /output/<filename>/view - View output file content")
+    print(" GET /output/<filename>/raw - Output file as plain text")
     print(" GET /status - System status")
     
     
     print("Starting via Waitress on 0.0.0.0:5000 …")
-    serve(app, host='0.0.0.0', port=5000)
+    # Request threads only upload and enqueue; processing runs in job_pool/stage_pool
+    serve(
+        app,
+        host='0.0.0.0',
+        port=5000,
+        threads=SERVER_THREADS,
+        connection_limit=1000,
+        channel_timeout=600,
+        asyncore_use_poll=True
+    )
@@ -100,9 +100,20 @@ class PDFProcessor {
                 body: formData
             });
             
-            const result = await response.json();
+            const queued = await response.json();
             
-            if (response.ok && result.success) {
+            if (!response.ok || !queued.success) {
+                throw new Error(queued.error || 'Upload failed');
+            }
+            
+            // Cached results come back immediately, otherwise poll the job
+            let result = queued;
+            if (queued.job_id) {
+                this.updateProgress(50, `Processing ${file.name}...`);
+                result = await this.waitForJob(queued.status_url);
+            }
+            
+            if (result.success) {
                 this.updateProgress(100, 'Processing complete!');
                 this.showMessage(
                     `Successfully processed: ${result.original_filename}`, 
@@ -115,7 +126,7 @@ class PDFProcessor {
                     this.showUploadProgress(false);
                 }, 2000);
             } else {
-                throw new Error(result.error || 'Upload failed');
+                throw new Error(result.error || 'Processing failed');
             }
             
         } catch (error) {
@@ -124,6 +135,22 @@ class PDFProcessor {
         }
     }
     
+    async waitForJob(statusUrl, intervalMs = 1000) {
+        while (true) {
+            await new Promise(resolve => setTimeout(resolve, intervalMs));
+            
+            const response = await fetch(statusUrl);
+            const job = await response.json();
+            
+            if (!response.ok) {
+                throw new Error(job.error || 'Processing failed');
+            }
+            if (job.status === 'completed') {
+                return job;
+            }
+        }
+    }
+    
     showUploadProgress(show) {
         this.uploadProgress.style.display = show ? 'block' : 'none';
         if (!show) {
@@ -196,10 +223,10 @@ class PDFProcessor {
     
     async viewFile(filename) {
         try {
-            const response = await fetch(`/output/${encodeURIComponent(filename)}/view`);
-            const result = await response.json();
+            const response = await fetch(`/output/${encodeURIComponent(filename)}/raw`);
             
-            if (response.ok && result.success) {
+            if (response.ok) {
+                const content = await response.text();
                 const newWindow = window.open('', '_blank');
                 newWindow.document.write(`
                     <html>
@@ -213,15 +240,15 @@ class PDFProcessor {
                         <body>
                             <div class="header">
                                 <h2>${filename}</h2>
-                                <p>Content Length: ${result.content_length} characters</p>
+                                <p>Content Length: ${content.length} characters</p>
                             </div>
-                            ${result.content}
+                            ${content}
                         </body>
                     </html>
                 `);
                 newWindow.document.close();
             } else {
-                throw new Error(result.error || 'Failed to view file');
+                throw new Error(response.status === 404 ? 'File not found' : 'Failed to view file');
             }
             
         } catch (error) {
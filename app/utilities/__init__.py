@@ -79,15 +79,16 @@ from .warning_config import configure_pdf_processing_warnings
 configure_pdf_processing_warnings()
 
 # Import main functions for easy access
-from .pdf_parser import extract_text_and_structure
+from .pdf_parser import extract_text_and_structure, iter_pages_and_structure
 from .image_detector import extract_images
 from .table_extractor import extract_tables
 from .metadata_extractor import extract_metadata, format_metadata_for_display
 from .ocr import perform_ocr
-from .content_organizer import organize_content_by_page, generate_documentation_section, format_page_wise_content
+from .content_organizer import organize_content_by_page, generate_documentation_section, format_page_wise_content, iter_page_wise_content
 
 __all__ = [
     'extract_text_and_structure',
+    'iter_pages_and_structure',
     'extract_images', 
     'extract_tables',
     'extract_metadata',
@@ -95,5 +96,6 @@ __all__ = [
     'perform_ocr',
     'organize_content_by_page',
     'generate_documentation_section', 
-    'format_page_wise_content'
+    'format_page_wise_content',
+    'iter_page_wise_content'
 ]
@@ -1,27 +1,50 @@
 # utilities/book_extractor.py
 
+import os
 import re
 import fitz
-from typing import Dict, List, Any, Optional
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+# Patterns used on every book, compiled once at import
+_INDEX_ENTRY_RE = re.compile(r'^[A-Za-z]', re.MULTILINE)
+_BIB_REF_RE = re.compile(r'^\d+\.', re.MULTILINE)
+_BIB_KEYWORD_RE = re.compile(r'bibliography|references|works cited')
+
+def _page_range_text(doc, start_page: int, end_page: int) -> str:
+    """Concatenated text of a 0-based page range"""
+    return "".join(doc[page_num].get_text() for page_num in range(start_page, min(end_page, len(doc))))
+
+def _chapter_text(pdf_path: str, start_page: int, end_page: int) -> str:
+    """Chapter text read from its own document handle; runs in a worker process"""
+    doc = fitz.open(pdf_path)
+    text = _page_range_text(doc, start_page, end_page)
+    doc.close()
+    return text
 
 class BookExtractor:
     """
     Specialized extractor for book-type PDFs
     """
     
-    def extract_book_structure(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract book-specific structural elements"""
+    def extract_book_structure(self, pdf_path: str, doc: Optional[fitz.Document] = None) -> Dict[str, Any]:
+        """Extract book-specific structural elements, reusing ``doc`` when already open"""
         
+        owns_doc = doc is None
         try:
-            doc = fitz.open(pdf_path)
+            if owns_doc:
+                doc = fitz.open(pdf_path)
             
             # Extract book components
             toc = self._extract_table_of_contents(doc)
-            chapters = self._extract_chapters(doc, toc)
-            index = self._extract_index(doc)
-            bibliography = self._extract_bibliography(doc)
+            chapters = self._extract_chapters(doc, toc, pdf_path)
             
-            doc.close()
+            # Index and bibliography both live in the last pages; read
+            # their text once and share it between the two scans
+            tail_pages = self._extract_tail_pages(doc, 20)
+            index = self._extract_index(tail_pages[-10:])
+            bibliography = self._extract_bibliography(tail_pages)
+            book_metadata = self._extract_book_metadata(doc)
             
             return {
                 'document_type': 'book',
@@ -30,11 +53,15 @@ class BookExtractor:
                 'index': index,
                 'bibliography': bibliography,
                 'total_chapters': len(chapters),
-                'book_metadata': self._extract_book_metadata(pdf_path)
+                'book_metadata': book_metadata
             }
             
         except Exception as e:
             return {'error': f"Book extraction failed: {str(e)}"}
+        
+        finally:
+            if owns_doc and doc is not None:
+                doc.close()
     
     def _extract_table_of_contents(self, doc) -> List[Dict[str, Any]]:
         """Extract table of contents with page numbers"""
@@ -56,20 +83,33 @@ class BookExtractor:
         
         return toc_entries
     
-    def _extract_chapters(self, doc, toc: List[Dict]) -> List[Dict[str, Any]]:
+    def _extract_chapters(self, doc, toc: List[Dict], pdf_path: Optional[str] = None) -> List[Dict[str, Any]]:
         """Extract chapter content based on TOC"""
         chapters = []
         
         chapter_entries = [entry for entry in toc if 'chapter' in entry.get('title', '').lower()]
         
+        n_pages = len(doc)
+        n_chapters = len(chapter_entries)
+        page_ranges = []
         for i, chapter in enumerate(chapter_entries):
             start_page = chapter['page'] - 1  # Convert to 0-based
-            end_page = chapter_entries[i + 1]['page'] - 1 if i + 1 < len(chapter_entries) else len(doc)
-            
-            chapter_text = ""
-            for page_num in range(start_page, min(end_page, len(doc))):
-                chapter_text += doc[page_num].get_text()
-            
+            end_page = chapter_entries[i + 1]['page'] - 1 if i + 1 < n_chapters else n_pages
+            page_ranges.append((start_page, end_page))
+        
+        # Chapters are independent, so read them in parallel worker processes
+        # (each reopens the PDF by path); a single chapter is not worth the spawn
+        if pdf_path and len(page_ranges) > 1:
+            with ProcessPoolExecutor(max_workers=min(len(page_ranges), os.cpu_count() or 1)) as executor:
+                futures = [executor.submit(_chapter_text, pdf_path, start_page, end_page)
+                           for start_page, end_page in page_ranges]
+                chapter_texts = [future.result() for future in futures]
+        else:
+            chapter_texts = [_page_range_text(doc, start_page, end_page)
+                             for start_page, end_page in page_ranges]
+        
+        for i, (chapter, (start_page, end_page), chapter_text) in enumerate(
+                zip(chapter_entries, page_ranges, chapter_texts)):
             chapters.append({
                 'chapter_number': i + 1,
                 'title': chapter['title'],
@@ -81,61 +121,65 @@ class BookExtractor:
         
         return chapters
     
-    def _extract_index(self, doc) -> Dict[str, Any]:
+    def _extract_tail_pages(self, doc, count: int) -> List[Tuple[str, str]]:
+        """Return (text, lowercased text) for the last ``count`` pages"""
+        tail_pages = []
+        for page_num in range(max(0, len(doc) - count), len(doc)):
+            text = doc[page_num].get_text()
+            tail_pages.append((text, text.lower()))
+        return tail_pages
+    
+    def _extract_index(self, tail_pages: List[Tuple[str, str]]) -> Dict[str, Any]:
         """Extract index from end of book"""
         # Look for index in last few pages
         index_content = ""
-        for page in doc[-10:]:  # Check last 10 pages
-            text = page.get_text()
-            if 'index' in text.lower()[:100]:  # Index likely at beginning of page
+        for text, text_lower in tail_pages:
+            if 'index' in text_lower[:100]:  # Index likely at beginning of page
                 index_content = text
                 break
         
         return {
             'present': bool(index_content),
             'content': index_content[:1000] if index_content else "",  # First 1000 chars
-            'entries_count': len(re.findall(r'^[A-Za-z]', index_content, re.MULTILINE))
+            'entries_count': len(_INDEX_ENTRY_RE.findall(index_content))
         }
     
-    def _extract_bibliography(self, doc) -> Dict[str, Any]:
+    def _extract_bibliography(self, tail_pages: List[Tuple[str, str]]) -> Dict[str, Any]:
         """Extract bibliography/references section"""
         bibliography_content = ""
         
         # Look for bibliography in last pages
-        for page in doc[-20:]:
-            text = page.get_text().lower()
-            if any(keyword in text for keyword in ['bibliography', 'references', 'works cited']):
-                bibliography_content = page.get_text()
+        for text, text_lower in tail_pages:
+            if _BIB_KEYWORD_RE.search(text_lower):
+                bibliography_content = text
                 break
         
         return {
             'present': bool(bibliography_content),
             'content': bibliography_content[:2000] if bibliography_content else "",
-            'reference_count': len(re.findall(r'^\d+\.', bibliography_content, re.MULTILINE))
+            'reference_count': len(_BIB_REF_RE.findall(bibliography_content))
         }
     
-    def _extract_book_metadata(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract book-specific metadata"""
+    def _extract_book_metadata(self, doc) -> Dict[str, Any]:
+        """Extract book-specific metadata from the already-open document"""
         try:
-            doc = fitz.open(pdf_path)
             metadata = doc.metadata
+            page_count = len(doc)
             
             # Extract from first few pages
-            first_page_text = doc[0].get_text() if len(doc) > 0 else ""
+            first_page_text = doc[0].get_text() if page_count > 0 else ""
             
             # Try to extract title, author, publisher
             title = self._extract_title_from_text(first_page_text)
             author = self._extract_author_from_text(first_page_text)
             publisher = self._extract_publisher_from_text(first_page_text)
             
-            doc.close()
-            
             return {
                 'title': title or metadata.get('title', ''),
                 'author': author or metadata.get('author', ''),
                 'publisher': publisher,
                 'creation_date': metadata.get('creationDate', ''),
-                'page_count': len(doc)
+                'page_count': page_count
             }
             
         except Exception as e:
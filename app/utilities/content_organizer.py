@@ -1,16 +1,29 @@
 # utilities/content_organizer.py
 
+import re
 import fitz  # PyMuPDF
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
 from collections import defaultdict
 from .document_classifier import DocumentTypeClassifier
 from .book_extractor import BookExtractor
 from .research_paper_extractor import ResearchPaperExtractor
 from .technical_report_extractor import TechnicalReportExtractor
 
+# Page marker lines written by pdf_parser, e.g. "--- Page 3 ---". Anchoring on
+# the preceding newline (rather than ^ with re.MULTILINE) gives the regex
+# engine a literal prefix to scan for, which is several times faster
+_PAGE_MARKER_RE = re.compile(r'\n[^\S\n]*--- Page[^\S\n]*(\d+)[^\S\n]*(?:---[^\n]*)?(?=\n|\Z)')
+
+# Rules used by format_page_wise_content, built once
+_PAGE_RULE = "=" * 50
+_PAGE_HEADER_RULE = "-" * 20
+_TEXT_RULE = "~" * 15
+_ITEM_RULE = "~" * 16
+
 
 def organize_content_by_page(pdf_path: str, text_data: Dict, images_data: List, 
-                           tables_data: List, metadata: Dict) -> Dict[str, Any]:
+                           tables_data: List, metadata: Dict,
+                           doc: Optional[fitz.Document] = None) -> Dict[str, Any]:
     """
     Organize extracted content by page number for structured output.
     
@@ -20,45 +33,38 @@ def organize_content_by_page(pdf_path: str, text_data: Dict, images_data: List,
         images_data: Image data from image_detector  
         tables_data: Table data from table_extractor
         metadata: Metadata from metadata_extractor
+        doc: Optional already-open document, used instead of re-opening the PDF
     
     Returns:
         Dictionary with page-wise organized content
     """
     try:
-        # Initialize page organization structure
-        doc = fitz.open(pdf_path)
-        total_pages = len(doc)
-        doc.close()
-        
-        page_content = {}
+        # Initialize page organization structure; the page count is already
+        # known from text extraction, so only re-open the PDF when it is missing
+        total_pages = text_data.get('structure', {}).get('total_pages')
+        if not total_pages:
+            if doc is not None:
+                total_pages = len(doc)
+            else:
+                with fitz.open(pdf_path) as pdf:
+                    total_pages = len(pdf)
         
         # Initialize each page
-        for page_num in range(1, total_pages + 1):
-            page_content[page_num] = {
-                'text': '',
-                'images': [],
-                'tables': []
-            }
+        page_content = {
+            page_num: {'text': '', 'images': [], 'tables': []}
+            for page_num in range(1, total_pages + 1)
+        }
         
         # Organize text content by page
         if text_data.get('text'):
             page_content = _organize_text_by_page(text_data['text'], page_content)
         
-        # Organize images by page
-        for image in images_data:
-            if not isinstance(image, dict) or 'error' in image:
-                continue
-            page_num = image.get('page', 1)
-            if page_num in page_content:
-                page_content[page_num]['images'].append(image)
-        
-        # Organize tables by page  
-        for table in tables_data:
-            if not isinstance(table, dict) or 'error' in table:
-                continue
-            page_num = table.get('page', 1)
-            if page_num in page_content:
-                page_content[page_num]['tables'].append(table)
+        # Organize images and tables by page: bucket each list in one pass,
+        # then attach whole buckets to the pages that exist
+        for key, items in (('images', images_data), ('tables', tables_data)):
+            for page_num, bucket in _bucket_by_page(items).items():
+                if page_num in page_content:
+                    page_content[page_num][key] = bucket
         
         return {
             'total_pages': total_pages,
@@ -76,36 +82,35 @@ def organize_content_by_page(pdf_path: str, text_data: Dict, images_data: List,
             'metadata': {}
         }
 
+def _bucket_by_page(items: List) -> Dict[Any, List]:
+    """Group extracted items by their 'page' (default 1), skipping failed extractions"""
+    buckets = defaultdict(list)
+    for item in items:
+        if isinstance(item, dict) and 'error' not in item:
+            buckets[item.get('page', 1)].append(item)
+    return buckets
+
 def _organize_text_by_page(full_text: str, page_content: Dict) -> Dict:
     """
     Parse full text and assign to appropriate pages.
     """
     try:
-        # Split text by page markers
-        lines = full_text.split('\n')
-        current_page = 1
-        current_page_text = []
+        # One C-level split on the "--- Page X ---" marker lines; the result
+        # alternates [text before first marker, page number, page text, ...].
+        # The leading newline lets a marker on the very first line match too
+        parts = _PAGE_MARKER_RE.split('\n' + full_text)
         
-        for line in lines:
-            # Check for page markers like "--- Page X ---"
-            if line.strip().startswith('--- Page') and 'Page' in line:
-                # Save previous page content
-                if current_page_text and current_page in page_content:
-                    page_content[current_page]['text'] = '\n'.join(current_page_text).strip()
-                
-                # Extract new page number
-                try:
-                    page_parts = line.split('Page')[1].split('---')[0].strip()
-                    current_page = int(page_parts)
-                    current_page_text = []
-                except (IndexError, ValueError):
-                    current_page_text.append(line)
-            else:
-                current_page_text.append(line)
+        # Text before the first marker belongs to page 1. An empty segment
+        # means a marker was directly followed by another marker (or the end
+        # of the text); such pages are left untouched
+        if parts[0] and 1 in page_content:
+            page_content[1]['text'] = parts[0].strip()
         
-        # Save last page content
-        if current_page_text and current_page in page_content:
-            page_content[current_page]['text'] = '\n'.join(current_page_text).strip()
+        for i in range(1, len(parts), 2):
+            page_num = int(parts[i])
+            page_text = parts[i + 1]
+            if page_text and page_num in page_content:
+                page_content[page_num]['text'] = page_text.strip()
         
         return page_content
         
@@ -149,61 +154,63 @@ def format_page_wise_content(page_content: Dict, total_pages: int) -> str:
     """
     Format page-wise content for output display.
     """
-    content_lines = []
-    content_lines.append("PAGE-WISE CONTENT ANALYSIS")
-    content_lines.append("=" * 50)
-    content_lines.append("")
+    return "\n".join(iter_page_wise_content(page_content, total_pages))
+
+def iter_page_wise_content(page_content: Dict, total_pages: int) -> Iterator[str]:
+    """
+    Yield the page-wise content display one block at a time, so callers
+    writing to a file never hold the whole section in memory. Joining the
+    blocks with newlines gives format_page_wise_content's output.
+    """
+    yield "PAGE-WISE CONTENT ANALYSIS"
+    yield _PAGE_RULE
+    yield ""
     
     for page_num in range(1, total_pages + 1):
         if page_num not in page_content:
             continue
             
+        # Each block below is one multi-line entry, so a page costs a handful
+        # of yields instead of one per output line
         page_data = page_content[page_num]
-        content_lines.append(f"PAGE {page_num}")
-        content_lines.append("-" * 20)
-        content_lines.append("")
+        yield f"PAGE {page_num}\n{_PAGE_HEADER_RULE}\n"
         
         # Text content
-        if page_data.get('text') and page_data['text'].strip():
-            content_lines.append("EXTRACTED TEXT:")
-            content_lines.append("~" * 15)
-            content_lines.append(page_data['text'].strip())
-            content_lines.append("")
+        text = page_data.get('text')
+        text = text.strip() if text else ''
+        if text:
+            yield f"EXTRACTED TEXT:\n{_TEXT_RULE}\n{text}\n"
         
         # Images
         if page_data.get('images'):
-            content_lines.append("EXTRACTED IMAGES:")
-            content_lines.append("~" * 16)
+            yield f"EXTRACTED IMAGES:\n{_ITEM_RULE}"
             for i, img in enumerate(page_data['images'], 1):
-                content_lines.append(f"Image {i}:")
-                content_lines.append(f"  Size: {img.get('size', 'Unknown')}")
-                content_lines.append(f"  Format: {img.get('format', 'Unknown')}")
-                if img.get('description'):
-                    content_lines.append(f"  Description: {img['description']}")
-                content_lines.append("")
+                description = f"\n  Description: {img['description']}" if img.get('description') else ""
+                yield (
+                    f"Image {i}:\n"
+                    f"  Size: {img.get('size', 'Unknown')}\n"
+                    f"  Format: {img.get('format', 'Unknown')}{description}\n"
+                )
         
         # Tables
         if page_data.get('tables'):
-            content_lines.append("EXTRACTED TABLES:")
-            content_lines.append("~" * 16)
+            yield f"EXTRACTED TABLES:\n{_ITEM_RULE}"
             for i, table in enumerate(page_data['tables'], 1):
-                content_lines.append(f"Table {i}:")
-                content_lines.append(f"  Dimensions: {table.get('shape', 'Unknown')}")
-                content_lines.append(f"  Accuracy: {table.get('accuracy', 'Unknown')}%")
-                content_lines.append(f"  Method: {table.get('method', 'Unknown')}")
-                if table.get('summary'):
-                    content_lines.append(f"  Summary: {table['summary']}")
+                summary = f"\n  Summary: {table['summary']}" if table.get('summary') else ""
+                preview = ""
                 if 'content' in table:
                     preview = table['content'][:200] + "..." if len(str(table['content'])) > 200 else str(table['content'])
-                    content_lines.append(f"  Preview: {preview}")
-                content_lines.append("")
+                    preview = f"\n  Preview: {preview}"
+                yield (
+                    f"Table {i}:\n"
+                    f"  Dimensions: {table.get('shape', 'Unknown')}\n"
+                    f"  Accuracy: {table.get('accuracy', 'Unknown')}%\n"
+                    f"  Method: {table.get('method', 'Unknown')}{summary}{preview}\n"
+                )
         
         # Add separator between pages
         if page_num < total_pages:
-            content_lines.append("=" * 50)
-            content_lines.append("")
-    
-    return "\n".join(content_lines)
+            yield f"{_PAGE_RULE}\n"
 
 def organize_content_by_document_type(pdf_path: str, text_data: Dict, images_data: List, 
                                     tables_data: List, metadata: Dict) -> Dict[str, Any]:
@@ -211,27 +218,30 @@ def organize_content_by_document_type(pdf_path: str, text_data: Dict, images_dat
     Enhanced content organization with document type classification
     """
     try:
-        # Step 1: Classify document type
-        classifier = DocumentTypeClassifier()
-        classification = classifier.classify_document(pdf_path)
-        
-        # Step 2: Apply type-specific extraction
-        type_specific_data = {}
-        
-        if classification['primary_type'] == 'book':
-            book_extractor = BookExtractor()
-            type_specific_data = book_extractor.extract_book_structure(pdf_path)
-        
-        elif classification['primary_type'] == 'research_paper':
-            paper_extractor = ResearchPaperExtractor()
-            type_specific_data = paper_extractor.extract_paper_structure(pdf_path)
-        
-        elif classification['primary_type'] == 'technical_report':
-            report_extractor = TechnicalReportExtractor()
-            type_specific_data = report_extractor.extract_report_structure(pdf_path)
-        
-        # Step 3: Organize by page (existing functionality)
-        page_organized = organize_content_by_page(pdf_path, text_data, images_data, tables_data, metadata)
+        # Open the PDF once and share the document across every stage
+        with fitz.open(pdf_path) as doc:
+            # Step 1: Classify document type
+            classifier = DocumentTypeClassifier()
+            classification = classifier.classify_document(pdf_path, doc=doc)
+            
+            # Step 2: Apply type-specific extraction
+            type_specific_data = {}
+            
+            if classification['primary_type'] == 'book':
+                book_extractor = BookExtractor()
+                type_specific_data = book_extractor.extract_book_structure(pdf_path, doc=doc)
+            
+            elif classification['primary_type'] == 'research_paper':
+                paper_extractor = ResearchPaperExtractor()
+                type_specific_data = paper_extractor.extract_paper_structure(pdf_path, doc=doc)
+            
+            elif classification['primary_type'] == 'technical_report':
+                report_extractor = TechnicalReportExtractor()
+                type_specific_data = report_extractor.extract_report_structure(pdf_path, doc=doc)
+            
+            # Step 3: Organize by page (existing functionality)
+            page_organized = organize_content_by_page(pdf_path, text_data, images_data, tables_data,
+                                                      metadata, doc=doc)
         
         # Step 4: Combine with type-specific data
         return {
@@ -6,6 +6,16 @@ from typing import Dict, List, Any, Optional
 from collections import Counter
 import numpy as np
 
+# Patterns applied to every classified document, compiled once at import
+_CHAPTER_RE = re.compile(r'chapter\s+\d+')
+# One alternation scans the text once; the three citation forms cannot
+# overlap, so the match count equals the sum of the separate counts
+_CITATION_RE = re.compile(
+    r'\[\d+\]'  # [1], [23], etc.
+    r'|\(\w+\s+et\s+al\.?\s*,?\s*\d{4}\)'  # (Smith et al., 2020)
+    r'|\(\w+,?\s*\d{4}\)'  # (Smith, 2020)
+)
+
 class DocumentTypeClassifier:
     """
     Intelligent document type classification for books, research papers, and technical reports
@@ -34,12 +44,15 @@ class DocumentTypeClassifier:
             }
         }
     
-    def classify_document(self, pdf_path: str) -> Dict[str, Any]:
+    def classify_document(self, pdf_path: str, doc: Optional[fitz.Document] = None) -> Dict[str, Any]:
         """
-        Classify PDF document type and extract type-specific characteristics
+        Classify PDF document type and extract type-specific characteristics.
+        An already-open ``doc`` is used as-is and left open for the caller.
         """
+        owns_doc = doc is None
         try:
-            doc = fitz.open(pdf_path)
+            if owns_doc:
+                doc = fitz.open(pdf_path)
             
             # Extract document characteristics
             characteristics = self._extract_characteristics(doc)
@@ -51,8 +64,6 @@ class DocumentTypeClassifier:
             primary_type = max(scores, key=scores.get)
             confidence = scores[primary_type]
             
-            doc.close()
-            
             return {
                 'primary_type': primary_type,
                 'confidence': confidence,
@@ -68,6 +79,10 @@ class DocumentTypeClassifier:
                 'confidence': 0.0,
                 'error': str(e)
             }
+        
+        finally:
+            if owns_doc and doc is not None:
+                doc.close()
     
     def _extract_characteristics(self, doc) -> Dict[str, Any]:
         """Extract document characteristics for classification"""
@@ -75,27 +90,28 @@ class DocumentTypeClassifier:
         # Basic document info
         page_count = len(doc)
         
-        # Extract text from first few pages and last few pages
-        first_pages_text = ""
-        last_pages_text = ""
-        full_text = ""
+        # Extract text from first few pages and last few pages; the page
+        # ranges overlap, so each page's lowercased text is extracted once
+        page_texts = {}
+        
+        def page_text(i):
+            text = page_texts.get(i)
+            if text is None:
+                text = page_texts[i] = doc[i].get_text().lower()
+            return text
         
         # Analyze first 5 pages
-        for i in range(min(5, page_count)):
-            first_pages_text += doc[i].get_text().lower()
+        first_pages_text = "".join(page_text(i) for i in range(min(5, page_count)))
         
         # Analyze last 5 pages
-        for i in range(max(0, page_count-5), page_count):
-            last_pages_text += doc[i].get_text().lower()
+        last_pages_text = "".join(page_text(i) for i in range(max(0, page_count-5), page_count))
         
         # Sample middle pages for full analysis
         sample_pages = min(10, page_count)
-        for i in range(0, page_count, max(1, page_count // sample_pages)):
-            full_text += doc[i].get_text().lower()
+        full_text = "".join(page_text(i) for i in range(0, page_count, max(1, page_count // sample_pages)))
         
         # Extract structural elements
-        headings = self._extract_headings(doc)
-        toc_present = self._detect_table_of_contents(doc)
+        toc_present = self._detect_table_of_contents(first_pages_text)
         citations = self._count_citations(full_text)
         
         return {
@@ -103,12 +119,11 @@ class DocumentTypeClassifier:
             'first_pages_text': first_pages_text,
             'last_pages_text': last_pages_text,
             'full_text': full_text,
-            'headings': headings,
             'toc_present': toc_present,
             'citation_count': citations,
             'has_abstract': 'abstract' in first_pages_text,
             'has_references': 'references' in last_pages_text or 'bibliography' in last_pages_text,
-            'has_chapters': bool(re.search(r'chapter\s+\d+', full_text)),
+            'has_chapters': _CHAPTER_RE.search(full_text) is not None,
             'has_executive_summary': 'executive summary' in first_pages_text
         }
     
@@ -187,37 +202,11 @@ class DocumentTypeClassifier:
         
         return priorities.get(doc_type, ['text_content', 'images', 'tables'])
     
-    def _extract_headings(self, doc) -> List[str]:
-        """Extract potential headings from document"""
-        headings = []
-        for page in doc:
-            blocks = page.get_text("dict")["blocks"]
-            for block in blocks:
-                if "lines" in block:
-                    for line in block["lines"]:
-                        for span in line["spans"]:
-                            if span["size"] > 12:  # Larger font likely heading
-                                headings.append(span["text"].strip())
-        return headings
-    
-    def _detect_table_of_contents(self, doc) -> bool:
-        """Detect presence of table of contents"""
-        for page in doc[:5]:  # Check first 5 pages
-            text = page.get_text().lower()
-            if any(indicator in text for indicator in ['table of contents', 'contents', 'toc']):
-                return True
-        return False
+    def _detect_table_of_contents(self, first_pages_text: str) -> bool:
+        """Detect presence of table of contents in the (lowercased) first pages"""
+        # 'table of contents' contains 'contents', so two checks cover all indicators
+        return 'contents' in first_pages_text or 'toc' in first_pages_text
     
     def _count_citations(self, text: str) -> int:
         """Count citation patterns in text"""
-        citation_patterns = [
-            r'\[\d+\]',  # [1], [23], etc.
-            r'\(\w+\s+et\s+al\.?\s*,?\s*\d{4}\)',  # (Smith et al., 2020)
-            r'\(\w+,?\s*\d{4}\)',  # (Smith, 2020)
-        ]
-        
-        total_citations = 0
-        for pattern in citation_patterns:
-            total_citations += len(re.findall(pattern, text))
-        
-        return total_citations
+        return sum(1 for _ in _CITATION_RE.finditer(text))
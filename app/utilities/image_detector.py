@@ -1,75 +1,132 @@
 import fitz  # PyMuPDF
 import os
+import numpy as np
 from PIL import Image
 from typing import List, Dict, Any
 import io
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+# Pages handled per worker task; blocks amortize process/IPC overhead
+IMAGE_PAGE_BLOCK = 16
+
+# Images outside this pixel range get a canned description without decoding
+TINY_IMAGE_PIXELS = 32 * 32
+HUGE_IMAGE_PIXELS = 16_000_000
 
 def extract_images(pdf_path: str) -> List[Dict[str, Any]]:
     """
     Extract all images from PDF and return metadata
     """
-    images_info = []
-    
     try:
         doc = fitz.open(pdf_path)
+        page_count = len(doc)
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            image_list = page.get_images(full=True)
-            
-            for img_index, img in enumerate(image_list):
-                try:
-                    # Extract image
-                    xref = img[0]
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    image_ext = base_image["ext"]
-                    
-                    # Get image properties
-                    image_obj = Image.open(io.BytesIO(image_bytes))
-                    width, height = image_obj.size
-                    
-                    # Generate description
-                    description = generate_image_description(image_obj, width, height)
-                    
-                    image_info = {
-                        'page': page_num + 1,
-                        'index': img_index + 1,
-                        'format': image_ext,
-                        'size': f"{width}x{height}",
-                        'width': width,
-                        'height': height,
-                        'file_size': len(image_bytes),
-                        'description': description,
-                        'xref': xref
-                    }
-                    
-                    images_info.append(image_info)
-                    
-                except Exception as e:
-                    # Log error but continue processing
-                    error_info = {
-                        'page': page_num + 1,
-                        'index': img_index + 1,
-                        'error': f"Failed to extract image: {str(e)}"
-                    }
-                    images_info.append(error_info)
-        
+        # Small documents are not worth the worker start-up cost
+        if page_count <= IMAGE_PAGE_BLOCK:
+            images_info = _extract_page_images(doc, range(page_count))
+            doc.close()
+            return images_info
         doc.close()
+        
+        # Image decoding is CPU-bound and independent per page, so blocks of
+        # pages are extracted in worker processes, each with its own document
+        blocks = [range(i, min(i + IMAGE_PAGE_BLOCK, page_count))
+                  for i in range(0, page_count, IMAGE_PAGE_BLOCK)]
+        images_info = []
+        with ProcessPoolExecutor(max_workers=min(len(blocks), os.cpu_count() or 1, 4)) as executor:
+            futures = [executor.submit(_extract_images_for_pages, pdf_path, block) for block in blocks]
+            # Collect in submission order so pages stay in order
+            for future in futures:
+                images_info.extend(future.result())
         return images_info
         
     except Exception as e:
         return [{'error': f"Image extraction failed: {str(e)}"}]
 
+def _extract_images_for_pages(pdf_path: str, page_nums: range) -> List[Dict[str, Any]]:
+    """
+    Extract image metadata for the given 0-based pages; runs in a worker process.
+    """
+    doc = fitz.open(pdf_path)
+    try:
+        return _extract_page_images(doc, page_nums)
+    finally:
+        doc.close()
+
+def _extract_page_images(doc, page_nums: range) -> List[Dict[str, Any]]:
+    """
+    Extract image metadata for the given 0-based pages of an open document
+    """
+    images_info = []
+    # PDFs reference one image object (logos, running headers) from many
+    # pages; decode and describe each xref once and reuse the result
+    seen = {}
+    extract_image = doc.extract_image
+    
+    for page_num, page in zip(page_nums, doc.pages(page_nums.start, page_nums.stop)):
+        image_list = page.get_images(full=True)
+        
+        for img_index, img in enumerate(image_list):
+            xref = img[0]
+            if xref in seen:
+                images_info.append({**seen[xref], 'page': page_num + 1, 'index': img_index + 1})
+                continue
+            
+            try:
+                # Extract image
+                base_image = extract_image(xref)
+                image_bytes = base_image["image"]
+                image_ext = base_image["ext"]
+                
+                # Get image properties; PyMuPDF already reports the
+                # dimensions, and Image.open only parses the header
+                width, height = base_image["width"], base_image["height"]
+                image_obj = Image.open(io.BytesIO(image_bytes))
+                
+                # Generate description
+                description = generate_image_description(image_obj, width, height)
+                
+                image_info = {
+                    'page': page_num + 1,
+                    'index': img_index + 1,
+                    'format': image_ext,
+                    'size': f"{width}x{height}",
+                    'width': width,
+                    'height': height,
+                    'file_size': len(image_bytes),
+                    'description': description,
+                    'xref': xref
+                }
+                
+            except Exception as e:
+                # Log error but continue processing
+                image_info = {
+                    'page': page_num + 1,
+                    'index': img_index + 1,
+                    'error': f"Failed to extract image: {str(e)}"
+                }
+            
+            seen[xref] = image_info
+            images_info.append(image_info)
+    
+    return images_info
+
 def generate_image_description(image_obj: Image.Image, width: int, height: int) -> str:
     """
     Generate a basic description of the image
     """
     try:
         # Basic image analysis
-        aspect_ratio = width / height
         total_pixels = width * height
         
+        # Icons/bullets and huge scans are not worth decoding for colour analysis
+        if total_pixels < TINY_IMAGE_PIXELS:
+            return f"Tiny glyph or icon ({width}x{height} pixels)"
+        if total_pixels > HUGE_IMAGE_PIXELS:
+            return f"Very large image ({width}x{height} pixels, analysis skipped)"
+        
+        aspect_ratio = width / height
+        
         # Determine image characteristics
         size_category = "small" if total_pixels < 50000 else "medium" if total_pixels < 500000 else "large"
         
@@ -88,8 +145,6 @@ def generate_image_description(image_obj: Image.Image, width: int, height: int)
         
         # Check if image might be a chart/graph (high contrast, geometric)
         try:
-            # Convert to grayscale for analysis
-            gray_image = image_obj.convert('L')
             # Simple heuristic: if image has very few colors, might be a chart
             if colors and len(colors) < 10:
                 content_type = "possibly a chart, diagram, or logo"
@@ -110,18 +165,18 @@ def detect_image_content_type(image_obj: Image.Image) -> str:
     try:
         width, height = image_obj.size
         
-        # Convert to grayscale for analysis
-        gray_image = image_obj.convert('L')
+        # Convert to grayscale for analysis (grayscale images are used as-is)
+        gray_image = image_obj if image_obj.mode == 'L' else image_obj.convert('L')
         
-        # Get histogram
-        histogram = gray_image.histogram()
+        # Get histogram as an array so the band sums are C-level reductions
+        histogram = np.asarray(gray_image.histogram(), dtype=np.int64)
         
         # Simple analysis
         total_pixels = width * height
         
         # Check for high contrast (charts/diagrams tend to have high contrast)
-        dark_pixels = sum(histogram[:85])  # Dark pixels
-        light_pixels = sum(histogram[170:])  # Light pixels
+        dark_pixels = histogram[:85].sum()  # Dark pixels
+        light_pixels = histogram[170:].sum()  # Light pixels
         contrast_ratio = (dark_pixels + light_pixels) / total_pixels
         
         if contrast_ratio > 0.7:
@@ -132,6 +187,11 @@ def detect_image_content_type(image_obj: Image.Image) -> str:
     except Exception:
         return "unknown"
 
+def _write_image_file(filepath: str, image_bytes: bytes) -> str:
+    with open(filepath, "wb") as image_file:
+        image_file.write(image_bytes)
+    return filepath
+
 def save_extracted_images(pdf_path: str, output_dir: str = "extracted_images") -> List[str]:
     """
     Save extracted images to disk (optional utility)
@@ -143,29 +203,33 @@ def save_extracted_images(pdf_path: str, output_dir: str = "extracted_images") -
         doc = fitz.open(pdf_path)
         pdf_name = os.path.splitext(os.path.basename(pdf_path))[0]
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            image_list = page.get_images(full=True)
-            
-            for img_index, img in enumerate(image_list):
-                try:
-                    xref = img[0]
-                    base_image = doc.extract_image(xref)
-                    image_bytes = base_image["image"]
-                    image_ext = base_image["ext"]
-                    
-                    # Create filename
-                    filename = f"{pdf_name}_page{page_num+1}_img{img_index+1}.{image_ext}"
-                    filepath = os.path.join(output_dir, filename)
-                    
-                    # Save image
-                    with open(filepath, "wb") as image_file:
-                        image_file.write(image_bytes)
-                    
-                    saved_files.append(filepath)
-                    
-                except Exception as e:
-                    print(f"Failed to save image: {str(e)}")
+        # Writes overlap with extraction of the next image; futures keep document order
+        futures = []
+        with ThreadPoolExecutor(max_workers=8) as writer:
+            for page_num, page in enumerate(doc):
+                image_list = page.get_images(full=True)
+                
+                for img_index, img in enumerate(image_list):
+                    try:
+                        xref = img[0]
+                        base_image = doc.extract_image(xref)
+                        image_bytes = base_image["image"]
+                        image_ext = base_image["ext"]
+                        
+                        # Create filename
+                        filename = f"{pdf_name}_page{page_num+1}_img{img_index+1}.{image_ext}"
+                        filepath = os.path.join(output_dir, filename)
+                        
+                        futures.append(writer.submit(_write_image_file, filepath, image_bytes))
+                        
+                    except Exception as e:
+                        print(f"Failed to save image: {str(e)}")
+        
+        for future in futures:
+            try:
+                saved_files.append(future.result())
+            except Exception as e:
+                print(f"Failed to save image: {str(e)}")
         
         doc.close()
         return saved_files
@@ -1,8 +1,13 @@
 import PyPDF2
 import fitz  # PyMuPDF
+import os
+import re
 from datetime import datetime
 from typing import Dict, Any, Optional
 
+# Fixed-width PDF date body: YYYYMMDD with optional HHmmSS
+_PDF_DATE_RE = re.compile(r'(\d{4})(\d{2})(\d{2})(?:(\d{2})(\d{2})(\d{2}))?')
+
 def extract_metadata(pdf_path: str) -> Dict[str, Any]:
     """
     Extract comprehensive metadata from PDF
@@ -13,11 +18,12 @@ def extract_metadata(pdf_path: str) -> Dict[str, Any]:
         # Try PyMuPDF first (more comprehensive)
         metadata.update(extract_metadata_pymupdf(pdf_path))
         
-        # Supplement with PyPDF2 if needed
-        pypdf2_metadata = extract_metadata_pypdf2(pdf_path)
-        for key, value in pypdf2_metadata.items():
-            if key not in metadata and value:
-                metadata[key] = value
+        # Fall back to a second parse with PyPDF2 only if PyMuPDF failed
+        if 'pymupdf_error' in metadata:
+            pypdf2_metadata = extract_metadata_pypdf2(pdf_path)
+            for key, value in pypdf2_metadata.items():
+                if key not in metadata and value:
+                    metadata[key] = value
         
         # Add file system metadata
         file_metadata = extract_file_metadata(pdf_path)
@@ -67,10 +73,11 @@ def extract_metadata_pymupdf(pdf_path: str) -> Dict[str, Any]:
         # Check if document has forms
         metadata['has_forms'] = bool(doc.form_n())
         
-        # Check for annotations
+        # Check for annotations; only walk the pages when there are some to count
         annotation_count = 0
-        for page in doc:
-            annotation_count += len(page.annots())
+        if doc.has_annots():
+            for page in doc:
+                annotation_count += len(page.annots())
         metadata['annotation_count'] = annotation_count
         
         # Check for bookmarks/outline
@@ -130,13 +137,17 @@ def extract_metadata_pypdf2(pdf_path: str) -> Dict[str, Any]:
     except Exception as e:
         return {'pypdf2_error': str(e)}
 
+# Keys extract_file_metadata adds: they describe one file on disk, not the
+# PDF's content, so they differ between identical uploads
+FILE_METADATA_KEYS = (
+    'file_size', 'file_size_mb', 'file_created', 'file_modified', 'file_accessed',
+    'file_permissions', 'filename', 'file_directory', 'file_extension', 'file_metadata_error'
+)
+
 def extract_file_metadata(pdf_path: str) -> Dict[str, Any]:
     """
     Extract file system metadata
     """
-    import os
-    import stat
-    
     metadata = {}
     
     try:
@@ -146,9 +157,11 @@ def extract_file_metadata(pdf_path: str) -> Dict[str, Any]:
         metadata['file_size_mb'] = round(file_stats.st_size / (1024 * 1024), 2)
         
         # File timestamps
-        metadata['file_created'] = datetime.fromtimestamp(file_stats.st_ctime).isoformat()
-        metadata['file_modified'] = datetime.fromtimestamp(file_stats.st_mtime).isoformat()
-        metadata['file_accessed'] = datetime.fromtimestamp(file_stats.st_atime).isoformat()
+        from_timestamp = datetime.fromtimestamp
+        for key, timestamp in (('file_created', file_stats.st_ctime),
+                               ('file_modified', file_stats.st_mtime),
+                               ('file_accessed', file_stats.st_atime)):
+            metadata[key] = from_timestamp(timestamp).isoformat()
         
         # File permissions
         metadata['file_permissions'] = oct(file_stats.st_mode)[-3:]
@@ -170,11 +183,27 @@ def parse_pdf_date(date_str: str) -> Optional[str]:
     if not date_str:
         return None
     
+    # PDF date format: D:YYYYMMDDHHmmSSOHH'mm'
+    if date_str.startswith("D:"):
+        date_str = date_str[2:]  # Remove "D:" prefix
+    
+    # Fast path: one regex match instead of six slices; a 14+ character
+    # string must carry a numeric time, otherwise it takes the slow path
+    match = _PDF_DATE_RE.match(date_str)
+    if match and (match.lastindex == 6 or len(date_str) < 14):
+        try:
+            parts = match.groups() if match.lastindex == 6 else match.groups()[:3]
+            return datetime(*map(int, parts)).isoformat()
+        except ValueError:
+            pass
+    
+    return _parse_pdf_date_slow(date_str)
+
+def _parse_pdf_date_slow(date_str: str) -> Optional[str]:
+    """
+    Component-wise parse for dates the fast path rejects
+    """
     try:
-        # PDF date format: D:YYYYMMDDHHmmSSOHH'mm'
-        if date_str.startswith("D:"):
-            date_str = date_str[2:]  # Remove "D:" prefix
-        
         # Extract date components
         if len(date_str) >= 14:
             year = int(date_str[:4])
@@ -5,55 +5,163 @@ import fitz  # PyMuPDF
 from PIL import Image
 import io
 import cv2
+import hashlib
 import numpy as np
+import os
 import re
-from typing import List, Dict, Any, Optional
+import threading
+from collections import OrderedDict
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Dict, Any, Optional, Union
 
-def perform_ocr(pdf_path: str) -> str:
+# Optional: tesserocr keeps one Tesseract engine loaded per process instead of
+# spawning the tesseract CLI (and reloading language models) on every call
+try:
+    from tesserocr import PyTessBaseAPI, OEM
+except ImportError:
+    PyTessBaseAPI = None
+
+_tess_api = None
+_tess_lock = threading.Lock()
+
+# Pages rendered and OCR'd per worker task; blocks amortize process/IPC overhead
+OCR_PAGE_BLOCK = 8
+
+# Page render resolution for OCR; printed text gains little above this
+OCR_DPI = 150
+
+# Page segmentation modes tried when choosing how to read a page
+OCR_PSMS = (
+    6,   # uniform block
+    3,   # auto page
+    13,  # raw line
+    7,   # single line
+    8,   # single word
+)
+
+# Documents longer than this get one PSM, chosen from this many sample pages
+OCR_PSM_SAMPLE_PAGES = 3
+
+# Recently OCR'd page renders per worker process, keyed by pixel digest, so
+# repeated pages (blank pages, letterheads) are deskewed and OCR'd once
+OCR_CACHE_SIZE = 256
+_ocr_cache = OrderedDict()
+
+# Embedded images smaller than this (icons, bullets, rules) are not OCR'd
+MIN_OCR_IMAGE_PIXELS = 10_000
+
+# Laplacian variance above which a page is treated as noisy enough to denoise
+NOISE_VARIANCE_THRESHOLD = 500
+
+def perform_ocr(pdf_path: str, page_indices: Optional[List[int]] = None,
+                dpi: int = OCR_DPI) -> str:
     """
     Perform OCR on PDF pages using enhanced pipeline:
       1. Extract existing text; skip OCR if sufficient.
       2. Convert pages to images, deskew, preprocess.
-      3. Try multiple PSMs and engine modes; select best by confidence.
+      3. Try multiple PSMs and engine modes; select best by confidence,
+         once per document from sample pages when it is long enough.
+    When page_indices (0-based) is given the caller has already checked the
+    text layer, so phase 1 is skipped and only those pages are OCR'd.
+    Pass a higher dpi for small print or low-quality scans.
     """
     try:
-        # Phase 1: existing text check
-        text_content = extract_existing_text(pdf_path)
-        if has_sufficient_text(text_content, min_length=200):
-            return f"[OCR Note: PDF contains sufficient extractable text]\n\n{text_content}"
+        if page_indices is None:
+            # Closed before the workers start; each opens its own document
+            with fitz.open(pdf_path) as doc:
+                # Phase 1: existing text check
+                text_content = extract_existing_text(pdf_path, doc=doc)
+                if has_sufficient_text(text_content, min_length=200):
+                    return f"[OCR Note: PDF contains sufficient extractable text]\n\n{text_content}"
 
-        # Phase 2: OCR on images
-        doc = fitz.open(pdf_path)
+                page_indices = list(range(len(doc)))
+
+        # Phase 2: OCR on images, in blocks of pages across worker processes
+        blocks = [page_indices[i:i + OCR_PAGE_BLOCK]
+                  for i in range(0, len(page_indices), OCR_PAGE_BLOCK)]
         ocr_results = []
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            pix = page.get_pixmap(dpi=300)
-            img = Image.open(io.BytesIO(pix.pil_tobytes(format="PNG")))
-            # Deskew
-            img = _deskew_image(img)
-            # Advanced preprocess
-            proc = preprocess_image_for_ocr(img)
-            # Multi-psm OCR
-            text, conf = _multi_psm_ocr(proc)
-            if text.strip():
-                ocr_results.append(f"--- OCR Page {page_num+1} (conf={conf:.1f}) ---")
-                ocr_results.append(text.strip())
-        doc.close()
+        if blocks:
+            with ProcessPoolExecutor(max_workers=min(len(blocks), os.cpu_count() or 1)) as executor:
+                # Score every PSM on a few spread-out pages and use the winner
+                # for the whole document instead of trying all PSMs per page
+                psm = None
+                if len(page_indices) > OCR_PSM_SAMPLE_PAGES:
+                    step = len(page_indices) // OCR_PSM_SAMPLE_PAGES
+                    samples = page_indices[::step][:OCR_PSM_SAMPLE_PAGES]
+                    psm = _select_best_psm(executor.map(_psm_confidences, repeat(pdf_path), samples, repeat(dpi)))
+                futures = [executor.submit(_ocr_pages, pdf_path, block, dpi, psm) for block in blocks]
+                # Collect in submission order so pages stay in order
+                for future in futures:
+                    ocr_results.extend(future.result())
         return "\n\n".join(ocr_results) if ocr_results else "[OCR Note: No text extracted via OCR]"
     except Exception as e:
         return f"[OCR Error: {str(e)}]"
 
-def extract_existing_text(pdf_path: str) -> str:
+def _ocr_pages(pdf_path: str, page_nums: List[int], dpi: int = OCR_DPI,
+               psm: Optional[int] = None) -> List[str]:
+    """
+    Render and OCR the given 0-based pages of the PDF; runs in a worker process.
+    Uses the given PSM, or picks the best PSM per page when psm is None.
+    """
+    doc = fitz.open(pdf_path)
+    ocr_results = []
+    for page_num in page_nums:
+        gray = _render_gray(doc[page_num], dpi)
+        key = (psm, gray.shape, hashlib.blake2b(gray, digest_size=16).digest())
+        cached = _ocr_cache.get(key)
+        if cached is not None:
+            _ocr_cache.move_to_end(key)
+            text, conf = cached
+        else:
+            # Deskew
+            img = _deskew_image(gray)
+            # Advanced preprocess
+            proc = preprocess_image_for_ocr(img)
+            # Document-wide PSM, or multi-psm OCR for short documents
+            text, conf = _multi_psm_ocr(proc) if psm is None else _ocr_image(proc, psm)
+            _ocr_cache[key] = (text, conf)
+            if len(_ocr_cache) > OCR_CACHE_SIZE:
+                _ocr_cache.popitem(last=False)
+        if text.strip():
+            ocr_results.append(f"--- OCR Page {page_num+1} (conf={conf:.1f}) ---")
+            ocr_results.append(text.strip())
+    doc.close()
+    return ocr_results
+
+def _psm_confidences(pdf_path: str, page_num: int, dpi: int = OCR_DPI) -> Dict[int, float]:
+    """
+    OCR one sample page with every PSM and return each mode's confidence; runs in a worker process.
+    """
+    with fitz.open(pdf_path) as doc:
+        gray = _render_gray(doc[page_num], dpi)
+    proc = preprocess_image_for_ocr(_deskew_image(gray))
+    return {psm: _ocr_image(proc, psm)[1] for psm in OCR_PSMS}
+
+def _select_best_psm(sample_confidences) -> int:
+    """
+    Pick the PSM with the highest total confidence across the sample pages.
+    """
+    totals = dict.fromkeys(OCR_PSMS, 0.0)
+    for confidences in sample_confidences:
+        for psm, conf in confidences.items():
+            totals[psm] += conf
+    return max(OCR_PSMS, key=totals.__getitem__)
+
+def extract_existing_text(pdf_path: str, doc: Optional[fitz.Document] = None) -> str:
     """
-    Extract existing digital text from PDF pages.
+    Extract existing digital text from PDF pages, reusing ``doc`` when already open.
     """
+    owns_doc = doc is None
     try:
-        doc = fitz.open(pdf_path)
-        text = "".join(page.get_text() for page in doc)
-        doc.close()
-        return text.strip()
+        if owns_doc:
+            doc = fitz.open(pdf_path)
+        return "".join(page.get_text() for page in doc).strip()
     except Exception:
         return ""
+    finally:
+        if owns_doc and doc is not None:
+            doc.close()
 
 def has_sufficient_text(text: str, min_length: int = 100) -> bool:
     """
@@ -67,52 +175,58 @@ def extract_text_via_ocr(pdf_path: str) -> str:
     """
     return perform_ocr(pdf_path)  # unified in perform_ocr
 
-def preprocess_image_for_ocr(image: Image.Image) -> Image.Image:
+def preprocess_image_for_ocr(image: Union[Image.Image, np.ndarray],
+                             denoise: Optional[bool] = None,
+                             low_contrast: bool = False) -> Image.Image:
     """
-    Enhance image for OCR: grayscale, denoise, CLAHE, adaptive threshold.
+    Enhance image for OCR: grayscale, CLAHE, denoise, threshold.
+    Accepts a PIL image or an RGB/grayscale NumPy array. denoise=None
+    denoises only when the page looks noisy; True/False force it.
+    low_contrast=True uses an adaptive threshold instead of Otsu.
     """
     try:
-        cv_img = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        gray = cv2.cvtColor(cv_img, cv2.COLOR_BGR2GRAY)
-        # CLAHE contrast
-        clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
-        gray = clahe.apply(gray)
-        # Denoise
-        gray = cv2.bilateralFilter(gray, 9, 75, 75)
-        # Threshold
-        th = cv2.adaptiveThreshold(gray,255,cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
-                                   cv2.THRESH_BINARY,11,2)
-        # Clean
-        kernel = cv2.getStructuringElement(cv2.MORPH_RECT,(2,2))
-        clean = cv2.morphologyEx(th, cv2.MORPH_CLOSE, kernel)
-        return Image.fromarray(clean)
+        return Image.fromarray(_preprocess_gray(_to_gray(image), denoise, low_contrast))
     except Exception:
-        return image
+        return image if isinstance(image, Image.Image) else Image.fromarray(image)
 
-def extract_text_from_images_in_pdf(pdf_path: str) -> List[Dict[str, Any]]:
+def extract_text_from_images_in_pdf(pdf_path: str,
+                                    doc: Optional[fitz.Document] = None) -> List[Dict[str, Any]]:
     """
-    Extract text from embedded images, with confidence.
+    Extract text from embedded images, with confidence. Reuses ``doc`` when already open.
     """
     results = []
+    owns_doc = doc is None
     try:
-        doc = fitz.open(pdf_path)
-        for pnum in range(len(doc)):
-            page = doc[pnum]
+        if owns_doc:
+            doc = fitz.open(pdf_path)
+        seen_xrefs = set()
+        for pnum, page in enumerate(doc):
             for idx, img in enumerate(page.get_images(full=True), start=1):
+                # get_images() already reports width/height; images shared
+                # across pages are OCR'd only where they first appear
+                xref, width, height = img[0], img[2], img[3]
+                if width * height < MIN_OCR_IMAGE_PIXELS or xref in seen_xrefs:
+                    continue
+                seen_xrefs.add(xref)
                 try:
-                    xref = img[0]
                     base = doc.extract_image(xref)
-                    im = Image.open(io.BytesIO(base["image"]))
-                    proc = preprocess_image_for_ocr(im)
-                    txt = pytesseract.image_to_string(proc, config='--psm 6')
-                    conf = get_ocr_confidence(proc)
+                    # Decode straight to a grayscale array and keep it in NumPy
+                    arr = cv2.imdecode(np.frombuffer(base["image"], np.uint8), cv2.IMREAD_GRAYSCALE)
+                    if arr is None:
+                        # Formats OpenCV cannot decode (JPX, JBIG2, ...) go through PIL
+                        proc = preprocess_image_for_ocr(Image.open(io.BytesIO(base["image"])))
+                    else:
+                        proc = _preprocess_gray(arr)
+                    txt, conf = _ocr_image(proc, psm=6)
                     if txt.strip():
                         results.append({'page':pnum+1,'image_index':idx,'text':txt.strip(),'confidence':conf})
                 except Exception as e:
                     results.append({'page':pnum+1,'image_index':idx,'error':str(e)})
-        doc.close()
     except Exception as e:
         results = [{'error':str(e)}]
+    finally:
+        if owns_doc and doc is not None:
+            doc.close()
     return results
 
 def get_ocr_confidence(image: Image.Image) -> Optional[float]:
@@ -121,27 +235,36 @@ def get_ocr_confidence(image: Image.Image) -> Optional[float]:
     """
     try:
         data = pytesseract.image_to_data(image, output_type=pytesseract.Output.DICT)
-        confs = [int(c) for c in data['conf'] if c.isdigit() and int(c)>0]
-        return round(sum(confs)/len(confs),2) if confs else None
+        return _mean_confidence(data['conf'])
     except Exception:
         return None
 
-def is_scanned_pdf(pdf_path: str, text_threshold: int = 50) -> bool:
+def is_scanned_pdf(pdf_path: str, text_threshold: int = 50,
+                   doc: Optional[fitz.Document] = None) -> bool:
     """
     Heuristic: PDF likely scanned if little text and many images per page.
+    Reuses ``doc`` when already open.
     """
+    owns_doc = doc is None
     try:
-        doc = fitz.open(pdf_path)
+        if owns_doc:
+            doc = fitz.open(pdf_path)
         total_text, total_imgs = 0, 0
-        for page in doc:
-            txt = page.get_text().strip()
+        for i, page in enumerate(doc):
+            # flags=0 skips ligature/whitespace handling; only the length matters
+            txt = page.get_text("text", flags=0).strip()
             total_text += len(txt)
+            # Pages so far are clearly digital; the remainder cannot plausibly flip it
+            if total_text / (i + 1) >= text_threshold * 5:
+                return False
             total_imgs += len(page.get_images())
         pages = len(doc)
-        doc.close()
         return (total_text/pages if pages else 0) < text_threshold and (total_imgs/pages if pages else 0) > 0.5
     except Exception:
         return False
+    finally:
+        if owns_doc and doc is not None:
+            doc.close()
 
 def configure_tesseract():
     """
@@ -158,37 +281,122 @@ def configure_tesseract():
 
 # Internal helpers
 
-def _deskew_image(image: Image.Image) -> Image.Image:
+def _to_gray(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
+    """
+    Return a single-channel uint8 array, converting from RGB only when needed.
+    """
+    arr = np.asarray(image)
+    return arr if arr.ndim == 2 else cv2.cvtColor(arr, cv2.COLOR_RGB2GRAY)
+
+def _render_gray(page: fitz.Page, dpi: int) -> np.ndarray:
+    """
+    Render a page straight to grayscale and wrap the raw samples; no PNG round trip.
+    """
+    pix = page.get_pixmap(dpi=dpi, colorspace=fitz.csGRAY, alpha=False)
+    return np.frombuffer(pix.samples, dtype=np.uint8).reshape(pix.height, pix.width)
+
+def _preprocess_gray(gray: np.ndarray, denoise: Optional[bool] = None,
+                     low_contrast: bool = False) -> np.ndarray:
+    """
+    CLAHE, optional denoise and binarization on a grayscale array.
+    """
+    # CLAHE contrast
+    clahe = cv2.createCLAHE(clipLimit=3.0, tileGridSize=(8,8))
+    gray = clahe.apply(gray)
+    # Denoise; a 3x3 median removes speckle at a fraction of bilateralFilter's cost
+    if denoise is None:
+        denoise = cv2.Laplacian(gray, cv2.CV_64F).var() > NOISE_VARIANCE_THRESHOLD
+    if denoise:
+        gray = cv2.medianBlur(gray, 3)
+    # Threshold; Otsu's global cut is one histogram pass, the adaptive
+    # threshold is kept for pages with uneven lighting or faint print
+    if low_contrast:
+        return cv2.adaptiveThreshold(gray,255,cv2.ADAPTIVE_THRESH_GAUSSIAN_C,
+                                     cv2.THRESH_BINARY,11,2)
+    _, th = cv2.threshold(gray, 0, 255, cv2.THRESH_BINARY | cv2.THRESH_OTSU)
+    return th
+
+def _deskew_image(image: Union[Image.Image, np.ndarray]) -> np.ndarray:
     """
     Detect skew angle via bounding box and rotate to correct[16].
+    Returns the rotated grayscale page as an array.
     """
-    cv_img = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2GRAY)
-    inv = cv2.bitwise_not(cv_img)
-    coords = np.column_stack(np.where(inv>0))
+    cv_img = _to_gray(image)
+    # Estimate the angle on a quarter-scale copy; findNonZero stays in C and
+    # avoids materializing every foreground coordinate of the full page
+    small = cv2.resize(cv_img, None, fx=0.25, fy=0.25, interpolation=cv2.INTER_AREA)
+    points = cv2.findNonZero(cv2.bitwise_not(small))
+    if points is None:
+        return cv_img
+    # findNonZero yields (x, y); keep the (row, col) order the angle rule expects
+    coords = np.ascontiguousarray(points[:, 0, ::-1])
     angle = cv2.minAreaRect(coords)[-1]
     if angle < -45: angle = -(90+angle)
     else: angle = -angle
     (h,w) = cv_img.shape
     M = cv2.getRotationMatrix2D((w//2,h//2), angle, 1.0)
-    rotated = cv2.warpAffine(np.array(image), M, (w,h),
+    rotated = cv2.warpAffine(cv_img, M, (w,h),
                              flags=cv2.INTER_CUBIC, borderMode=cv2.BORDER_REPLICATE)
-    return Image.fromarray(rotated)
+    return rotated
+
+def _get_tess_api():
+    """
+    Lazily create this process's persistent Tesseract engine (None without tesserocr).
+    """
+    global _tess_api
+    if _tess_api is None and PyTessBaseAPI is not None:
+        _tess_api = PyTessBaseAPI(lang='eng', oem=OEM.LSTM_ONLY)
+    return _tess_api
+
+def _ocr_image(image: Union[Image.Image, np.ndarray], psm: int) -> tuple[str,float]:
+    """
+    OCR one image (PIL or array) with the given PSM; return text and mean confidence.
+    """
+    with _tess_lock:
+        api = _get_tess_api()
+        if api is not None:
+            api.SetPageSegMode(psm)
+            api.SetImage(image if isinstance(image, Image.Image) else Image.fromarray(image))
+            return api.GetUTF8Text(), float(api.MeanTextConf())
+    # One Tesseract run yields both the words and their confidences for this PSM
+    data = pytesseract.image_to_data(image, config=f'--oem 1 --psm {psm}',
+                                     output_type=pytesseract.Output.DICT)
+    return _text_from_data(data), _mean_confidence(data['conf']) or 0.0
+
+def _mean_confidence(confs) -> Optional[float]:
+    """
+    Average the positive word confidences reported by image_to_data.
+    """
+    # One vectorized conversion; Tesseract reports numbers (or numeric strings)
+    values = np.asarray(confs, dtype=np.float64)
+    values = values[values > 0]
+    return round(float(values.mean()),2) if values.size else None
+
+def _text_from_data(data: Dict[str, List[Any]]) -> str:
+    """
+    Rebuild plain text from image_to_data output, one line per Tesseract line.
+    """
+    lines, words, current = [], [], None
+    for word, block, par, line in zip(data['text'], data['block_num'],
+                                      data['par_num'], data['line_num']):
+        if not word.strip():
+            continue
+        if (block, par, line) != current:
+            if words:
+                lines.append(" ".join(words))
+            words, current = [], (block, par, line)
+        words.append(word)
+    if words:
+        lines.append(" ".join(words))
+    return "\n".join(lines)
 
 def _multi_psm_ocr(image: Image.Image) -> tuple[str,float]:
     """
     Try multiple PSMs and OEMs; return best text and confidence[2][8].
     """
-    configs = [
-        '--oem 1 --psm 6',   # uniform block
-        '--oem 1 --psm 3',   # auto page
-        '--oem 1 --psm 13',  # raw line
-        '--oem 1 --psm 7',   # single line
-        '--oem 1 --psm 8',   # single word
-    ]
     best_text, best_conf = "", 0.0
-    for cfg in configs:
-        txt = pytesseract.image_to_string(image, config=cfg)
-        conf = get_ocr_confidence(image) or 0.0
+    for psm in OCR_PSMS:
+        txt, conf = _ocr_image(image, psm)
         if conf > best_conf:
             best_conf, best_text = conf, txt
     return best_text, best_conf
@@ -1,40 +1,65 @@
 import PyPDF2
 import fitz  # PyMuPDF
 import pymupdf
+import os
 import re
-from typing import Dict, List, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Iterator, Optional
+
+# Documents longer than this have their page text extracted across processes
+PARALLEL_TEXT_MIN_PAGES = 10
+
+def iter_pages_and_structure(pdf_path: str) -> Iterator[Dict[str, Any]]:
+    """
+    Yield each page's text and heading candidates as the page is parsed
+    """
+    # Use PyMuPDF for better text extraction
+    doc = pymupdf.open(pdf_path)
+    try:
+        for page_num, page in enumerate(doc):
+            
+            # One "dict" extraction serves both the text and the headings;
+            # text flags leave out image blocks, which carry raw image data
+            blocks = page.get_text("dict", flags=pymupdf.TEXTFLAGS_TEXT)
+            
+            # Extract text laid out as plain get_text() does: each line ends in a newline
+            page_text = "".join(
+                "".join(span['text'] for span in line['spans']) + "\n"
+                for block in blocks['blocks'] if 'lines' in block
+                for line in block['lines']
+            )
+            
+            # Extract potential headings based on font size and formatting
+            yield {
+                'page': page_num + 1,
+                'text': page_text,
+                'headings': extract_headings_from_blocks(blocks, page_num + 1)
+            }
+    finally:
+        doc.close()
 
 def extract_text_and_structure(pdf_path: str) -> Dict[str, Any]:
     """
     Extract text content and document structure from PDF
     """
     try:
-        # Use PyMuPDF for better text extraction
-        doc = pymupdf.open(pdf_path)
-        
-        full_text = ""
+        text_parts = []
+        page_char_counts = []
         headings = []
+        
+        for page in iter_pages_and_structure(pdf_path):
+            text_parts.append(f"\n--- Page {page['page']} ---\n")
+            text_parts.append(page['text'])
+            page_char_counts.append(len(page['text'].strip()))
+            headings.extend(page['headings'])
+        
+        full_text = "".join(text_parts)
         structure = {
-            'total_pages': len(doc),
+            'total_pages': len(page_char_counts),
             'headings': [],
             'sections': []
         }
         
-        for page_num in range(len(doc)):
-            page = doc[page_num]
-            
-            # Extract text
-            page_text = page.get_text()
-            full_text += f"\n--- Page {page_num + 1} ---\n"
-            full_text += page_text
-            
-            # Extract potential headings based on font size and formatting
-            blocks = page.get_text("dict")
-            page_headings = extract_headings_from_blocks(blocks, page_num + 1)
-            headings.extend(page_headings)
-        
-        doc.close()
-        
         # Process headings to create structure
         structure['headings'] = [h['text'] for h in headings]
         structure['sections'] = organize_sections(headings)
@@ -42,13 +67,48 @@ def extract_text_and_structure(pdf_path: str) -> Dict[str, Any]:
         return {
             'text': full_text,
             'structure': structure,
-            'headings': headings
+            'headings': headings,
+            'page_char_counts': page_char_counts
         }
         
     except Exception as e:
         # Fallback to PyPDF2
         return extract_text_pypdf2(pdf_path)
 
+def extract_page_texts(pdf_path: str, doc: Optional[fitz.Document] = None, start: int = 0) -> List[str]:
+    """
+    Plain text of every page from ``start`` on, in order, reusing ``doc`` when
+    already open. Long documents are split into contiguous page ranges
+    extracted in worker processes.
+    """
+    owns_doc = doc is None
+    if owns_doc:
+        doc = pymupdf.open(pdf_path)
+    try:
+        page_count = len(doc)
+        workers = min(os.cpu_count() or 1, 4)
+        if page_count - start <= PARALLEL_TEXT_MIN_PAGES or workers == 1:
+            # An explicit range, since doc.pages() rejects start == page_count
+            return [doc.load_page(i).get_text() for i in range(start, page_count)]
+    finally:
+        if owns_doc:
+            doc.close()
+    
+    # Documents cannot be pickled, so each worker reopens the file for its range
+    step = -(-(page_count - start) // workers)
+    ranges = [(first, min(first + step, page_count)) for first in range(start, page_count, step)]
+    with ProcessPoolExecutor(max_workers=len(ranges)) as executor:
+        futures = [executor.submit(_page_texts_for_range, pdf_path, first, stop) for first, stop in ranges]
+        # Collect in submission order so pages stay in order
+        return [text for future in futures for text in future.result()]
+
+def _page_texts_for_range(pdf_path: str, start: int, stop: int) -> List[str]:
+    """
+    Plain text of pages [start, stop); runs in a worker process.
+    """
+    with pymupdf.open(pdf_path) as doc:
+        return [page.get_text() for page in doc.pages(start, stop)]
+
 def extract_headings_from_blocks(blocks: Dict, page_num: int) -> List[Dict]:
     """
     Extract headings based on font characteristics
@@ -58,53 +118,47 @@ def extract_headings_from_blocks(blocks: Dict, page_num: int) -> List[Dict]:
     if 'blocks' not in blocks:
         return headings
     
-    font_sizes = []
-    
-    # First pass: collect all font sizes
+    # Single pass: total the font sizes for the page average while keeping
+    # the lines whose text could be a heading
+    size_total = 0
+    size_count = 0
+    candidates = []
     for block in blocks['blocks']:
         if 'lines' in block:
             for line in block['lines']:
                 if 'spans' in line:
-                    for span in line['spans']:
-                        if 'size' in span:
-                            font_sizes.append(span['size'])
-    
-    if not font_sizes:
-        return headings
-    
-    # Determine threshold for headings (larger than average)
-    avg_font_size = sum(font_sizes) / len(font_sizes)
-    heading_threshold = avg_font_size * 1.2
-    
-    # Second pass: identify headings
-    for block in blocks['blocks']:
-        if 'lines' in block:
-            for line in block['lines']:
-                if 'spans' in line:
-                    line_text = ""
+                    span_texts = []
                     max_font_size = 0
                     is_bold = False
                     
                     for span in line['spans']:
                         if 'text' in span:
-                            line_text += span['text']
+                            span_texts.append(span['text'])
                         if 'size' in span:
-                            max_font_size = max(max_font_size, span['size'])
+                            size = span['size']
+                            size_total += size
+                            size_count += 1
+                            if size > max_font_size:
+                                max_font_size = size
                         if 'flags' in span and span['flags'] & 2**4:  # Bold flag
                             is_bold = True
                     
                     # Clean and check if it's a potential heading
-                    line_text = line_text.strip()
-                    if (len(line_text) > 0 and len(line_text) < 200 and 
-                        (max_font_size > heading_threshold or is_bold) and
-                        not line_text.endswith('.')):
-                        
-                        headings.append({
-                            'text': line_text,
-                            'page': page_num,
-                            'font_size': max_font_size,
-                            'is_bold': is_bold
-                        })
+                    line_text = "".join(span_texts).strip()
+                    if 0 < len(line_text) < 200 and not line_text.endswith('.'):
+                        candidates.append((line_text, max_font_size, is_bold))
+    
+    if not size_count:
+        return headings
+    
+    # Determine threshold for headings (larger than average)
+    heading_threshold = (size_total / size_count) * 1.2
+    
+    headings = [
+        {'text': line_text, 'page': page_num, 'font_size': max_font_size, 'is_bold': is_bold}
+        for line_text, max_font_size, is_bold in candidates
+        if max_font_size > heading_threshold or is_bold
+    ]
     
     return headings
 
@@ -148,22 +202,25 @@ def extract_text_pypdf2(pdf_path: str) -> Dict[str, Any]:
     try:
         with open(pdf_path, 'rb') as file:
             pdf_reader = PyPDF2.PdfReader(file)
-            full_text = ""
+            text_parts = []
+            page_char_counts = []
             
             for page_num in range(len(pdf_reader.pages)):
                 page = pdf_reader.pages[page_num]
                 page_text = page.extract_text()
-                full_text += f"\n--- Page {page_num + 1} ---\n"
-                full_text += page_text
+                text_parts.append(f"\n--- Page {page_num + 1} ---\n")
+                text_parts.append(page_text)
+                page_char_counts.append(len(page_text.strip()))
             
             return {
-                'text': full_text,
+                'text': "".join(text_parts),
                 'structure': {
                     'total_pages': len(pdf_reader.pages),
                     'headings': [],
                     'sections': []
                 },
-                'headings': []
+                'headings': [],
+                'page_char_counts': page_char_counts
             }
     except Exception as e:
         return {
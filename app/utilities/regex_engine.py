@@ -0,0 +1,54 @@
+# utilities/regex_engine.py
+
+import re
+
+# Optional: RE2 matches in linear time without backtracking, which is faster
+# on long extracted text and safe against pathological input
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+_INLINE_FLAGS = ((re.IGNORECASE, 'i'), (re.MULTILINE, 'm'), (re.DOTALL, 's'))
+
+# Perl classes and word boundaries: ASCII-only in RE2 but Unicode-aware in
+# re, so a pattern using them would match differently on non-ASCII text
+# (e.g. r'\d+\.?\s*' and "1.\u00a0Introduction"). An even run of backslashes
+# before the class letter is an escaped backslash, not a class
+_ASCII_ONLY_IN_RE2 = re.compile(r'(?<!\\)(?:\\\\)*\\[sSwWdDbB]')
+
+def compile_pattern(pattern: str, flags: int = 0):
+    r"""
+    Compile with RE2 when installed and the pattern matches the same there,
+    else with re. Patterns using \s, \w, \d or \b stay on re, since RE2's
+    versions are ASCII-only. Flags are passed to RE2 inline, since its
+    compile() takes options, not flags.
+    """
+    if re2 is not None and not _ASCII_ONLY_IN_RE2.search(pattern):
+        inline = ''.join(letter for flag, letter in _INLINE_FLAGS if flags & flag)
+        try:
+            return re2.compile(f'(?{inline}){pattern}' if inline else pattern)
+        except Exception:
+            pass  # e.g. lookarounds or \Z, which RE2 does not support
+    return re.compile(pattern, flags)
+
+def line_ends_with_word(text: str, word: str) -> bool:
+    r"""
+    True if some line ends with ``word`` or ``word + 's'`` (any case, trailing
+    whitespace allowed); the same test as re.search(word + r's?\s*$', text,
+    re.IGNORECASE | re.MULTILINE) done with str.find instead of a regex scan.
+    ``word`` must be lowercase.
+    """
+    lower = text.lower()
+    start = lower.find(word)
+    while start != -1:
+        end = start + len(word)
+        if lower.startswith('s', end):
+            end += 1
+        # Only whitespace may follow up to the end of the line
+        while end < len(lower) and lower[end] != '\n' and lower[end].isspace():
+            end += 1
+        if end == len(lower) or lower[end] == '\n':
+            return True
+        start = lower.find(word, start + 1)
+    return False
@@ -2,52 +2,124 @@
 
 import re
 import fitz
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
+
+from .pdf_parser import extract_page_texts
+from .regex_engine import compile_pattern, line_ends_with_word
+
+# Patterns are compiled once here rather than looked up per page
+_ABSTRACT_RE = re.compile(r'abstract\s*[\n:]?(.*?)(?=\n\s*(?:keywords?|introduction|1\.?\s+introduction))',
+                          re.IGNORECASE | re.DOTALL)
+
+# Common author patterns in academic papers
+_AUTHOR_RES = (
+    re.compile(r'([A-Z][a-z]+\s+[A-Z][a-z]+)(?:\s*[,\n]\s*([A-Z][a-z]+\s+[A-Z][a-z]+))*'),
+    re.compile(r'([A-Z]\.\s*[A-Z][a-z]+)(?:\s*[,\n]\s*([A-Z]\.\s*[A-Z][a-z]+))*'),
+)
+
+# Common academic section headings in one alternation, so the text is
+# scanned once; the alternatives cannot overlap, so matches arrive in order.
+# Patterns scanned over the full text go through compile_pattern, which uses
+# RE2 where it matches the same as re
+_SECTION_RE = compile_pattern(
+    r'(\d+\.?\s*(?:'
+    r'introduction|background|literature\s+review'
+    r'|methodology|methods|materials\s+and\s+methods'
+    r'|results|findings|analysis'
+    r'|discussion|conclusion|conclusions'
+    r'|references|bibliography'
+    r'))\s*\n',
+    re.IGNORECASE | re.MULTILINE
+)
+
+_REFERENCE_ENTRY_RES = (
+    re.compile(r'^\[\d+\]\s*(.+?)(?=^\[\d+\]|\Z)', re.MULTILINE | re.DOTALL),  # [1] reference format
+    re.compile(r'^\d+\.\s*(.+?)(?=^\d+\.|\Z)', re.MULTILINE | re.DOTALL),      # 1. reference format
+)
+
+# Citation patterns
+_CITATION_RE = compile_pattern(
+    r'\[(\d+(?:,\s*\d+)*)\]'  # [1], [1,2,3]
+    r'|\(([A-Z][a-z]+(?:\s+et\s+al\.?)?,?\s*\d{4})\)'  # (Smith, 2020), (Smith et al., 2020)
+)
+
+# Figure and table caption patterns; the named group tells the kind apart
+_CAPTION_RE = compile_pattern(
+    r'(?P<figure>(?:Figure|Fig\.)\s+\d+[.:]\s*[^\n]+)'
+    r'|(?P<table>Table\s+\d+[.:]\s*[^\n]+)',
+    re.IGNORECASE
+)
+
+# First non-whitespace character; bounds section previews by offset
+_NON_SPACE_RE = re.compile(r'\S')
+
+SECTION_PREVIEW_CHARS = 1000
 
 class ResearchPaperExtractor:
     """
     Specialized extractor for research paper PDFs
     """
     
-    def extract_paper_structure(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract research paper structural elements"""
+    def extract_paper_structure(self, pdf_path: str, doc: Optional[fitz.Document] = None) -> Dict[str, Any]:
+        """Extract research paper structural elements, reusing ``doc`` when already open"""
         
         try:
-            doc = fitz.open(pdf_path)
-            
             # Extract paper components
-            abstract = self._extract_abstract(doc)
-            authors = self._extract_authors(doc)
-            sections = self._extract_sections(doc)
-            references = self._extract_references(doc)
-            citations = self._extract_citations(doc)
-            figures = self._extract_figure_captions(doc)
-            
-            doc.close()
+            components = {}
+            for stage in self.iter_paper_structure(pdf_path, doc=doc):
+                components.update(stage)
             
             return {
                 'document_type': 'research_paper',
-                'abstract': abstract,
-                'authors': authors,
-                'sections': sections,
-                'references': references,
-                'citations': citations,
-                'figures': figures,
+                'abstract': components['abstract'],
+                'authors': components['authors'],
+                'sections': components['sections'],
+                'references': components['references'],
+                'citations': components['citations'],
+                'figures': components['figures'],
                 'paper_metadata': self._extract_paper_metadata(pdf_path)
             }
             
         except Exception as e:
             return {'error': f"Research paper extraction failed: {str(e)}"}
     
-    def _extract_abstract(self, doc) -> Dict[str, Any]:
+    def iter_paper_structure(self, pdf_path: str, doc: Optional[fitz.Document] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield paper components in stages (front matter, body, references) so callers
+        that only need the first pages can stop before the whole text is extracted
+        """
+        owns_doc = doc is None
+        if owns_doc:
+            doc = fitz.open(pdf_path)
+        try:
+            # Stage 1: abstract and authors only need the first pages
+            front_pages = [doc.load_page(i).get_text() for i in range(min(3, doc.page_count))]
+            yield {
+                'abstract': self._extract_abstract(front_pages),
+                'authors': self._extract_authors(front_pages)
+            }
+            
+            # Stage 2: extract each remaining page's text once (in parallel for
+            # long documents); the remaining components work from these strings
+            page_texts = front_pages + extract_page_texts(pdf_path, doc=doc, start=len(front_pages))
+            yield {
+                'sections': self._extract_sections(page_texts),
+                'citations': self._extract_citations(page_texts),
+                'figures': self._extract_figure_captions(page_texts)
+            }
+            
+            # Stage 3: references sit in the last pages
+            yield {'references': self._extract_references(page_texts)}
+        finally:
+            if owns_doc:
+                doc.close()
+    
+    def _extract_abstract(self, page_texts: List[str]) -> Dict[str, Any]:
         """Extract abstract section"""
         
-        for page in doc[:3]:  # Abstract usually in first 3 pages
-            text = page.get_text()
-            
+        for page_num, text in enumerate(page_texts[:3]):  # Abstract usually in first 3 pages
             # Look for abstract section
-            abstract_match = re.search(r'abstract\s*[\n:]?(.*?)(?=\n\s*(?:keywords?|introduction|1\.?\s+introduction))', 
-                                     text, re.IGNORECASE | re.DOTALL)
+            abstract_match = _ABSTRACT_RE.search(text)
             
             if abstract_match:
                 abstract_text = abstract_match.group(1).strip()
@@ -55,25 +127,19 @@ class ResearchPaperExtractor:
                     'present': True,
                     'content': abstract_text,
                     'word_count': len(abstract_text.split()),
-                    'page': page.number + 1
+                    'page': page_num + 1
                 }
         
         return {'present': False, 'content': '', 'word_count': 0}
     
-    def _extract_authors(self, doc) -> List[Dict[str, Any]]:
+    def _extract_authors(self, page_texts: List[str]) -> List[Dict[str, Any]]:
         """Extract author information"""
         
-        first_page_text = doc[0].get_text() if len(doc) > 0 else ""
-        
-        # Common author patterns in academic papers
-        author_patterns = [
-            r'([A-Z][a-z]+\s+[A-Z][a-z]+)(?:\s*[,\n]\s*([A-Z][a-z]+\s+[A-Z][a-z]+))*',
-            r'([A-Z]\.\s*[A-Z][a-z]+)(?:\s*[,\n]\s*([A-Z]\.\s*[A-Z][a-z]+))*'
-        ]
+        first_page_text = page_texts[0] if page_texts else ""
         
         authors = []
-        for pattern in author_patterns:
-            matches = re.findall(pattern, first_page_text[:500])  # Check first 500 chars
+        for pattern in _AUTHOR_RES:
+            matches = pattern.findall(first_page_text[:500])  # Check first 500 chars
             for match in matches:
                 if isinstance(match, tuple):
                     authors.extend([name.strip() for name in match if name.strip()])
@@ -85,69 +151,59 @@ class ResearchPaperExtractor:
         
         return [{'name': author, 'affiliation': ''} for author in unique_authors[:10]]  # Limit to 10
     
-    def _extract_sections(self, doc) -> List[Dict[str, Any]]:
+    def _extract_sections(self, page_texts: List[str]) -> List[Dict[str, Any]]:
         """Extract paper sections (Introduction, Methods, Results, etc.)"""
         
         sections = []
-        full_text = ""
         
         # Collect all text
-        for page in doc:
-            full_text += f"\n--- Page {page.number + 1} ---\n"
-            full_text += page.get_text()
-        
-        # Common academic section patterns
-        section_patterns = [
-            r'(\d+\.?\s*(?:introduction|background|literature\s+review))\s*\n',
-            r'(\d+\.?\s*(?:methodology|methods|materials\s+and\s+methods))\s*\n',
-            r'(\d+\.?\s*(?:results|findings|analysis))\s*\n',
-            r'(\d+\.?\s*(?:discussion|conclusion|conclusions))\s*\n',
-            r'(\d+\.?\s*(?:references|bibliography))\s*\n'
-        ]
-        
-        for pattern in section_patterns:
-            matches = re.finditer(pattern, full_text, re.IGNORECASE | re.MULTILINE)
-            for match in matches:
-                sections.append({
-                    'title': match.group(1).strip(),
-                    'start_position': match.start(),
-                    'section_type': self._classify_section_type(match.group(1))
-                })
-        
-        # Sort by position and extract content
-        sections.sort(key=lambda x: x['start_position'])
-        
+        full_text = "".join(
+            f"\n--- Page {page_num + 1} ---\n{text}" for page_num, text in enumerate(page_texts)
+        )
+        
+        for match in _SECTION_RE.finditer(full_text):
+            sections.append({
+                'title': match.group(1).strip(),
+                'start_position': match.start(),
+                'section_type': self._classify_section_type(match.group(1))
+            })
+        
+        # Extract content up to the next section (matches are already in position order).
+        # Only the preview window is sliced, never the whole section text
         for i, section in enumerate(sections):
             start_pos = section['start_position']
             end_pos = sections[i + 1]['start_position'] if i + 1 < len(sections) else len(full_text)
             
-            section['content'] = full_text[start_pos:end_pos].strip()[:1000]  # First 1000 chars
+            first = _NON_SPACE_RE.search(full_text, start_pos, end_pos)
+            if first is None:
+                section['content'] = ''
+            else:
+                preview_end = min(end_pos, first.start() + SECTION_PREVIEW_CHARS)
+                content = full_text[first.start():preview_end]
+                # Trailing whitespace is trimmed only when nothing follows it in the section
+                if _NON_SPACE_RE.search(full_text, preview_end, end_pos) is None:
+                    content = content.rstrip()
+                section['content'] = content
             section['word_count'] = len(section['content'].split())
         
         return sections
     
-    def _extract_references(self, doc) -> Dict[str, Any]:
+    def _extract_references(self, page_texts: List[str]) -> Dict[str, Any]:
         """Extract references/bibliography"""
         
         references_text = ""
         reference_entries = []
         
         # Look for references in last pages
-        for page in doc[-10:]:
-            text = page.get_text()
-            if re.search(r'references?\s*$', text, re.IGNORECASE | re.MULTILINE):
+        for text in page_texts[-10:]:
+            if line_ends_with_word(text, 'reference'):
                 references_text = text
                 break
         
         if references_text:
             # Extract individual references
-            ref_patterns = [
-                r'^\[\d+\]\s*(.+?)(?=^\[\d+\]|\Z)',  # [1] reference format
-                r'^\d+\.\s*(.+?)(?=^\d+\.|\Z)',      # 1. reference format
-            ]
-            
-            for pattern in ref_patterns:
-                matches = re.findall(pattern, references_text, re.MULTILINE | re.DOTALL)
+            for pattern in _REFERENCE_ENTRY_RES:
+                matches = pattern.findall(references_text)
                 reference_entries.extend([ref.strip() for ref in matches])
         
         return {
@@ -157,52 +213,36 @@ class ResearchPaperExtractor:
             'count': len(reference_entries)
         }
     
-    def _extract_citations(self, doc) -> Dict[str, Any]:
+    def _extract_citations(self, page_texts: List[str]) -> Dict[str, Any]:
         """Extract in-text citations"""
         
-        full_text = ""
-        for page in doc:
-            full_text += page.get_text()
-        
-        # Citation patterns
-        citation_patterns = [
-            r'\[(\d+(?:,\s*\d+)*)\]',  # [1], [1,2,3]
-            r'\(([A-Z][a-z]+(?:\s+et\s+al\.?)?,?\s*\d{4})\)',  # (Smith, 2020), (Smith et al., 2020)
-        ]
+        full_text = "".join(page_texts)
         
-        citations = []
-        for pattern in citation_patterns:
-            matches = re.findall(pattern, full_text)
-            citations.extend(matches)
+        # Count while streaming matches; only the distinct citations are kept
+        total_count = 0
+        unique_citations = set()
+        for match in _CITATION_RE.finditer(full_text):
+            total_count += 1
+            unique_citations.add(match.group(1) or match.group(2))
         
+        word_count = len(full_text.split())
         return {
-            'total_count': len(citations),
-            'unique_citations': list(set(citations)),
-            'citation_density': len(citations) / len(full_text.split()) if full_text else 0
+            'total_count': total_count,
+            'unique_citations': list(unique_citations),
+            'citation_density': total_count / word_count if word_count else 0
         }
     
-    def _extract_figure_captions(self, doc) -> List[Dict[str, Any]]:
+    def _extract_figure_captions(self, page_texts: List[str]) -> List[Dict[str, Any]]:
         """Extract figure and table captions"""
         
         captions = []
         
-        for page_num, page in enumerate(doc):
-            text = page.get_text()
-            
-            # Figure caption patterns
-            fig_patterns = [
-                r'(Figure\s+\d+[.:]\s*[^\n]+)',
-                r'(Fig\.\s+\d+[.:]\s*[^\n]+)',
-                r'(Table\s+\d+[.:]\s*[^\n]+)'
-            ]
-            
-            for pattern in fig_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
-                for match in matches:
-                    captions.append({
-                        'caption': match.strip(),
-                        'page': page_num + 1,
-                        'type': 'figure' if 'fig' in match.lower() else 'table'
-                    })
+        for page_num, text in enumerate(page_texts):
+            for match in _CAPTION_RE.finditer(text):
+                captions.append({
+                    'caption': match.group().strip(),
+                    'page': page_num + 1,
+                    'type': 'figure' if match.group('figure') else 'table'
+                })
         
         return captions
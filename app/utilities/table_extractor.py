@@ -3,11 +3,15 @@
 import os
 import logging
 import warnings
-from concurrent.futures import ThreadPoolExecutor, as_completed
+from concurrent.futures import ProcessPoolExecutor
+from tempfile import TemporaryDirectory
 
 import camelot
+import fitz  # PyMuPDF
 import pdfplumber
+import numpy as np
 import pandas as pd
+from PyPDF2 import PdfReader, PdfWriter
 
 # Suppress warnings at module level
 warnings.filterwarnings("ignore", category=UserWarning, module="camelot")
@@ -16,6 +20,10 @@ warnings.filterwarnings("ignore", message=".*does not lie in column range.*")
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Below this many pages the strategies run one after another in-process;
+# starting a worker process per strategy would cost more than it saves
+TABLE_PARALLEL_MIN_PAGES = 4
+
 def extract_tables(pdf_path: str):
     """
     Enhanced table extraction optimized for research papers
@@ -29,23 +37,36 @@ def extract_tables(pdf_path: str):
         with warnings.catch_warnings():
             warnings.simplefilter("ignore")
             
-            # Try multiple strategies for research papers
+            # Try multiple strategies for research papers; they are CPU-bound
+            # and hold the GIL, so each runs in its own process
             strategies = [
-                ("camelot_lattice_research", lambda: _camelot_research_optimized(pdf_path, "lattice")),
-                ("camelot_stream_research", lambda: _camelot_research_optimized(pdf_path, "stream")),
-                ("pdfplumber_research", lambda: _pdfplumber_research_optimized(pdf_path)),
+                ("camelot_lattice_research", _camelot_research_optimized, (pdf_path, "lattice")),
+                ("camelot_stream_research", _camelot_research_optimized, (pdf_path, "stream")),
+                ("pymupdf_research", _pymupdf_research_optimized, (pdf_path,)),
             ]
             
+            with fitz.open(pdf_path) as doc:
+                page_count = doc.page_count
+            
+            # Results are collected in strategy order so ties resolve the same way every run
             results = []
-            with ThreadPoolExecutor(max_workers=len(strategies)) as executor:
-                future_to_name = {executor.submit(func): name for name, func in strategies}
-                for future in as_completed(future_to_name):
-                    name = future_to_name[future]
-                    try:
-                        tables, score = future.result()
-                        results.append((name, tables, score))
-                    except Exception as e:
-                        logger.warning(f"Strategy {name} raised exception: {e}")
+            def record(name, run):
+                try:
+                    # A strategy with a fallback also returns the method that
+                    # produced its tables, which is reported instead of its name
+                    tables, score, *method = run()
+                    results.append((method[0] if method else name, tables, score))
+                except Exception as e:
+                    logger.warning(f"Strategy {name} raised exception: {e}")
+            
+            if page_count < TABLE_PARALLEL_MIN_PAGES:
+                for name, func, args in strategies:
+                    record(name, lambda: func(*args))
+            else:
+                with ProcessPoolExecutor(max_workers=len(strategies)) as executor:
+                    futures = [(name, executor.submit(func, *args)) for name, func, args in strategies]
+                    for name, future in futures:
+                        record(name, future.result)
             
             # Select best strategy by highest average score
             if results:
@@ -72,44 +93,73 @@ def extract_tables(pdf_path: str):
         logger.error(f"Table extraction failed: {str(e)}")
         return [{'error': f'Extraction failed: {str(e)}'}]
 
+def _clean_table(df):
+    """
+    Blank out empty cells, drop all-empty rows/columns and score the fill ratio.
+    Returns (None, 0) when nothing is left. One NumPy mask over the cells
+    replaces the replace/dropna/dropna/count chain of pandas passes.
+    """
+    values = df.to_numpy()
+    filled = pd.notna(values)
+    filled[filled] = values[filled] != ''
+    rows = filled.any(axis=1)
+    if not rows.any():
+        return None, 0
+    cols = filled.any(axis=0)
+    kept = filled[np.ix_(rows, cols)]
+    df = df.iloc[rows, cols].mask(~kept, pd.NA)
+    return df, (kept.sum() / kept.size) * 100
+
+def _split_pdf_pages(pdf_path, out_dir):
+    """Write each page to its own single-page PDF, parsing the source once"""
+    reader = PdfReader(pdf_path)
+    page_paths = []
+    for page_num, page in enumerate(reader.pages, start=1):
+        writer = PdfWriter()
+        writer.add_page(page)
+        page_path = os.path.join(out_dir, f"page-{page_num}.pdf")
+        with open(page_path, 'wb') as page_file:
+            writer.write(page_file)
+        page_paths.append(page_path)
+    return page_paths
+
 def _camelot_research_optimized(pdf_path, flavor):
     """Camelot extraction optimized for research papers"""
     try:
         # Research paper specific settings
         if flavor == "lattice":
-            tables = camelot.read_pdf(
-                pdf_path, 
+            options = dict(
                 flavor='lattice',
-                pages='all',
                 line_scale=40,
                 copy_text=['h'],
                 strip_text='\n',
                 suppress_stdout=True  # Suppress camelot warnings
             )
         else:  # stream
-            tables = camelot.read_pdf(
-                pdf_path,
+            options = dict(
                 flavor='stream',
-                pages='all',
                 row_tol=2,
                 edge_tol=100,
                 suppress_stdout=True  # Suppress camelot warnings
             )
         
+        # pages='all' makes Camelot re-read and re-parse the whole file for
+        # every page it splits out; split once here and feed it single pages
+        tables = []
+        with TemporaryDirectory() as tmp_dir:
+            for page_path in _split_pdf_pages(pdf_path, tmp_dir):
+                tables.extend(camelot.read_pdf(page_path, pages='1', **options))
+        
         dfs = []
         scores = []
         
         for table in tables:
             try:
-                df = table.df
-                if not df.empty:
-                    # Clean the dataframe
-                    df = df.replace('', pd.NA).dropna(how='all').dropna(axis=1, how='all')
-                    if not df.empty:
-                        dfs.append(df)
-                        # Calculate confidence score
-                        score = (df.count().sum() / df.size) * 100 if df.size > 0 else 0
-                        scores.append(score)
+                # Clean the dataframe and calculate confidence score
+                df, score = _clean_table(table.df)
+                if df is not None:
+                    dfs.append(df)
+                    scores.append(score)
             except Exception as e:
                 logger.warning(f"Error processing table: {e}")
                 continue
@@ -122,6 +172,55 @@ def _camelot_research_optimized(pdf_path, flavor):
         logger.warning(f"Camelot {flavor} failed: {e}")
         return [], 0
 
+def _pymupdf_research_optimized(pdf_path):
+    """
+    PyMuPDF table detection with the pdfplumber settings; pdfplumber if it
+    finds nothing. Returns (tables, score, method) so the fallback's tables
+    are reported as pdfplumber_research
+    """
+    dfs = []
+    scores = []
+    
+    try:
+        with fitz.open(pdf_path) as doc:
+            for page in doc:
+                try:
+                    # Same line-based settings as the pdfplumber strategy
+                    tables = page.find_tables(
+                        vertical_strategy="lines",
+                        horizontal_strategy="lines",
+                        snap_tolerance=3,
+                        join_tolerance=3,
+                        edge_min_length=3,
+                        min_words_vertical=2,
+                        min_words_horizontal=1
+                    )
+                    
+                    for table in tables:
+                        try:
+                            df, score = _clean_table(table.to_pandas())
+                            
+                            if df is not None:
+                                dfs.append(df)
+                                scores.append(score)
+                        except Exception as e:
+                            logger.warning(f"Error converting table to DataFrame: {e}")
+                            continue
+                
+                except Exception as e:
+                    logger.warning(f"Error extracting tables from page: {e}")
+                    continue
+    
+    except Exception as e:
+        logger.warning(f"PyMuPDF research extraction failed: {e}")
+    
+    if not dfs:
+        return (*_pdfplumber_research_optimized(pdf_path), "pdfplumber_research")
+    
+    avg_score = sum(scores) / len(scores)
+    logger.info(f"PyMuPDF research: extracted {len(dfs)} tables, score={avg_score:.2f}")
+    return dfs, avg_score, "pymupdf_research"
+
 def _pdfplumber_research_optimized(pdf_path):
     """PDFPlumber extraction optimized for research papers"""
     dfs = []
@@ -150,12 +249,10 @@ def _pdfplumber_research_optimized(pdf_path):
                                 data = table[1:] if len(table) > 1 else []
                                 
                                 if data:
-                                    df = pd.DataFrame(data, columns=headers)
-                                    df = df.replace('', pd.NA).dropna(how='all').dropna(axis=1, how='all')
+                                    df, score = _clean_table(pd.DataFrame(data, columns=headers))
                                     
-                                    if not df.empty:
+                                    if df is not None:
                                         dfs.append(df)
-                                        score = (df.count().sum() / df.size) * 100 if df.size > 0 else 0
                                         scores.append(score)
                             except Exception as e:
                                 logger.warning(f"Error converting table to DataFrame: {e}")
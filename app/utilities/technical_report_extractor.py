@@ -2,50 +2,92 @@
 
 import re
 import fitz
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
+
+from .pdf_parser import extract_page_texts
+from .regex_engine import compile_pattern, line_ends_with_word
+
+# Patterns are compiled once here rather than looked up per page
+_EXECUTIVE_SUMMARY_RE = re.compile(r'executive\s+summary\s*[\n:]?(.*?)(?=\n\s*(?:\d+\.|\w+:|\n\n))',
+                                   re.IGNORECASE | re.DOTALL)
+
+_RECOMMENDATION_ENTRY_RES = (
+    re.compile(r'^\d+\.\s*(.+?)(?=^\d+\.|\Z)', re.MULTILINE | re.DOTALL),  # 1. recommendation format
+    re.compile(r'^[•·]\s*(.+?)(?=^[•·]|\Z)', re.MULTILINE | re.DOTALL),    # • bullet format
+)
+
+# Technical specification patterns; scanned on every page, so compiled with
+# compile_pattern to use RE2 where it matches the same as re
+_SPECIFICATION_RES = tuple(compile_pattern(pattern, re.IGNORECASE) for pattern in (
+    r'(specification[s]?\s*[:]\s*[^\n]+)',
+    r'(technical\s+data\s*[:]\s*[^\n]+)',
+    r'(parameters?\s*[:]\s*[^\n]+)',
+    r'(\w+\s*[:]\s*\d+[\.\d]*\s*\w+)',  # Parameter: value unit
+))
+
+_APPENDIX_RE = compile_pattern(r'(appendix\s+[a-z]\s*[:\-]?\s*[^\n]+)', re.IGNORECASE)
+
+_METHODOLOGY_RE = re.compile(r'methodology\s*[\n:]?(.*?)(?=\n\s*(?:\d+\.|\w+:))', re.IGNORECASE | re.DOTALL)
 
 class TechnicalReportExtractor:
     """
     Specialized extractor for technical report PDFs
     """
     
-    def extract_report_structure(self, pdf_path: str) -> Dict[str, Any]:
-        """Extract technical report structural elements"""
+    def extract_report_structure(self, pdf_path: str, doc: Optional[fitz.Document] = None) -> Dict[str, Any]:
+        """Extract technical report structural elements, reusing ``doc`` when already open"""
         
         try:
-            doc = fitz.open(pdf_path)
-            
             # Extract report components
-            executive_summary = self._extract_executive_summary(doc)
-            recommendations = self._extract_recommendations(doc)
-            technical_specs = self._extract_technical_specifications(doc)
-            appendices = self._extract_appendices(doc)
-            methodology = self._extract_methodology(doc)
-            
-            doc.close()
+            components = {}
+            for stage in self.iter_report_structure(pdf_path, doc=doc):
+                components.update(stage)
             
             return {
                 'document_type': 'technical_report',
-                'executive_summary': executive_summary,
-                'recommendations': recommendations,
-                'technical_specifications': technical_specs,
-                'appendices': appendices,
-                'methodology': methodology,
+                'executive_summary': components['executive_summary'],
+                'recommendations': components['recommendations'],
+                'technical_specifications': components['technical_specifications'],
+                'appendices': components['appendices'],
+                'methodology': components['methodology'],
                 'report_metadata': self._extract_report_metadata(pdf_path)
             }
             
         except Exception as e:
             return {'error': f"Technical report extraction failed: {str(e)}"}
     
-    def _extract_executive_summary(self, doc) -> Dict[str, Any]:
+    def iter_report_structure(self, pdf_path: str, doc: Optional[fitz.Document] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Yield report components in stages (executive summary, then the rest) so callers
+        that only need the first pages can stop before the whole text is extracted
+        """
+        owns_doc = doc is None
+        if owns_doc:
+            doc = fitz.open(pdf_path)
+        try:
+            # Stage 1: the executive summary only needs the first pages
+            front_pages = [doc.load_page(i).get_text() for i in range(min(5, doc.page_count))]
+            yield {'executive_summary': self._extract_executive_summary(front_pages)}
+            
+            # Stage 2: extract each remaining page's text once (in parallel for
+            # long documents); the remaining components work from these strings
+            page_texts = front_pages + extract_page_texts(pdf_path, doc=doc, start=len(front_pages))
+            yield {
+                'recommendations': self._extract_recommendations(page_texts),
+                'technical_specifications': self._extract_technical_specifications(page_texts),
+                'appendices': self._extract_appendices(page_texts),
+                'methodology': self._extract_methodology(page_texts)
+            }
+        finally:
+            if owns_doc:
+                doc.close()
+    
+    def _extract_executive_summary(self, page_texts: List[str]) -> Dict[str, Any]:
         """Extract executive summary section"""
         
-        for page in doc[:5]:  # Usually in first 5 pages
-            text = page.get_text()
-            
+        for page_num, text in enumerate(page_texts[:5]):  # Usually in first 5 pages
             # Look for executive summary
-            summary_match = re.search(r'executive\s+summary\s*[\n:]?(.*?)(?=\n\s*(?:\d+\.|\w+:|\n\n))', 
-                                    text, re.IGNORECASE | re.DOTALL)
+            summary_match = _EXECUTIVE_SUMMARY_RE.search(text)
             
             if summary_match:
                 summary_text = summary_match.group(1).strip()
@@ -53,32 +95,25 @@ class TechnicalReportExtractor:
                     'present': True,
                     'content': summary_text,
                     'word_count': len(summary_text.split()),
-                    'page': page.number + 1
+                    'page': page_num + 1
                 }
         
         return {'present': False, 'content': '', 'word_count': 0}
     
-    def _extract_recommendations(self, doc) -> Dict[str, Any]:
+    def _extract_recommendations(self, page_texts: List[str]) -> Dict[str, Any]:
         """Extract recommendations section"""
         
         recommendations_text = ""
         recommendations_list = []
         
-        for page in doc:
-            text = page.get_text()
-            
+        for text in page_texts:
             # Look for recommendations section
-            if re.search(r'recommendations?\s*$', text, re.IGNORECASE | re.MULTILINE):
+            if line_ends_with_word(text, 'recommendation'):
                 recommendations_text = text
                 
                 # Extract individual recommendations
-                rec_patterns = [
-                    r'^\d+\.\s*(.+?)(?=^\d+\.|\Z)',  # 1. recommendation format
-                    r'^[•·]\s*(.+?)(?=^[•·]|\Z)',    # • bullet format
-                ]
-                
-                for pattern in rec_patterns:
-                    matches = re.findall(pattern, text, re.MULTILINE | re.DOTALL)
+                for pattern in _RECOMMENDATION_ENTRY_RES:
+                    matches = pattern.findall(text)
                     recommendations_list.extend([rec.strip() for rec in matches])
                 
                 break
@@ -90,24 +125,15 @@ class TechnicalReportExtractor:
             'count': len(recommendations_list)
         }
     
-    def _extract_technical_specifications(self, doc) -> Dict[str, Any]:
+    def _extract_technical_specifications(self, page_texts: List[str]) -> Dict[str, Any]:
         """Extract technical specifications and data"""
         
         tech_specs = []
         
-        for page_num, page in enumerate(doc):
-            text = page.get_text()
-            
+        for page_num, text in enumerate(page_texts):
             # Look for technical specification patterns
-            spec_patterns = [
-                r'(specification[s]?\s*[:]\s*[^\n]+)',
-                r'(technical\s+data\s*[:]\s*[^\n]+)',
-                r'(parameters?\s*[:]\s*[^\n]+)',
-                r'(\w+\s*[:]\s*\d+[\.\d]*\s*\w+)'  # Parameter: value unit
-            ]
-            
-            for pattern in spec_patterns:
-                matches = re.findall(pattern, text, re.IGNORECASE)
+            for pattern in _SPECIFICATION_RES:
+                matches = pattern.findall(text)
                 for match in matches:
                     tech_specs.append({
                         'specification': match.strip(),
@@ -119,17 +145,15 @@ class TechnicalReportExtractor:
             'count': len(tech_specs)
         }
     
-    def _extract_appendices(self, doc) -> Dict[str, Any]:
+    def _extract_appendices(self, page_texts: List[str]) -> Dict[str, Any]:
         """Extract appendices information"""
         
         appendices = []
         
         # Look for appendices in last portion of document
-        for page_num, page in enumerate(doc[-20:], start=len(doc)-20):
-            text = page.get_text()
-            
+        for page_num, text in enumerate(page_texts[-20:], start=len(page_texts)-20):
             # Look for appendix markers
-            appendix_matches = re.findall(r'(appendix\s+[a-z]\s*[:\-]?\s*[^\n]+)', text, re.IGNORECASE)
+            appendix_matches = _APPENDIX_RE.findall(text)
             
             for match in appendix_matches:
                 appendices.append({
@@ -143,16 +167,13 @@ class TechnicalReportExtractor:
             'count': len(appendices)
         }
     
-    def _extract_methodology(self, doc) -> Dict[str, Any]:
+    def _extract_methodology(self, page_texts: List[str]) -> Dict[str, Any]:
         """Extract methodology section"""
         
-        full_text = ""
-        for page in doc:
-            full_text += page.get_text()
+        full_text = "".join(page_texts)
         
         # Look for methodology section
-        methodology_match = re.search(r'methodology\s*[\n:]?(.*?)(?=\n\s*(?:\d+\.|\w+:))', 
-                                    full_text, re.IGNORECASE | re.DOTALL)
+        methodology_match = _METHODOLOGY_RE.search(full_text)
         
         if methodology_match:
             methodology_text = methodology_match.group(1).strip()
@@ -1,26 +1,42 @@
 # utilities/warning_config.py
 
 import warnings
+from contextlib import contextmanager, nullcontext
 import logging
 import os
 
+# Set once the filters and log levels are in place; they are process-wide,
+# so later calls (main, the utilities package, every context entry) are no-ops
+_CONFIGURED = False
+
 def configure_pdf_processing_warnings():
     """
-    Configure warning suppression for PDF processing libraries
+    Configure warning suppression for PDF processing libraries (once per process)
     """
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+    _CONFIGURED = True
+    
+    # Message patterns are compiled once here by filterwarnings and then
+    # match()ed against each warning's text, so they stop at the last literal
+    # instead of ending in a ".*" that would scan the rest of every message
     
     # Suppress PDFMiner warnings
     warnings.filterwarnings("ignore", module="pdfminer")
-    warnings.filterwarnings("ignore", message=".*Cannot set gray non-stroke color.*")
-    warnings.filterwarnings("ignore", message=".*Pattern.*invalid float value.*")
+    warnings.filterwarnings("ignore", message=".*Cannot set gray non-stroke color")
+    warnings.filterwarnings("ignore", message=".*Pattern.*invalid float value")
     
     # Suppress Camelot warnings  
     warnings.filterwarnings("ignore", module="camelot")
-    warnings.filterwarnings("ignore", message=".*does not lie in column range.*")
+    warnings.filterwarnings("ignore", message=".*does not lie in column range")
     
     # Suppress PDFPlumber warnings
     warnings.filterwarnings("ignore", module="pdfplumber")
     
+    # Suppress library deprecation notices (pandas/numpy via camelot)
+    warnings.filterwarnings("ignore", category=FutureWarning)
+    
     # Configure logging levels
     logging.getLogger("pdfminer").setLevel(logging.ERROR)
     logging.getLogger("pdfminer.pdfinterp").setLevel(logging.ERROR)
@@ -30,17 +46,15 @@ def configure_pdf_processing_warnings():
     # Set environment variable to suppress Werkzeug warnings in Flask
     os.environ['WERKZEUG_RUN_MAIN'] = 'true'
 
+@contextmanager
+def _configuring_context():
+    configure_pdf_processing_warnings()
+    yield
+
 def suppress_warnings_context():
     """
     Context manager for temporary warning suppression
     """
-    class WarningSuppressionContext:
-        def __enter__(self):
-            configure_pdf_processing_warnings()
-            return self
-            
-        def __exit__(self, exc_type, exc_val, exc_tb):
-            # Warnings remain suppressed - no need to restore
-            pass
-    
-    return WarningSuppressionContext()
+    # Warnings remain suppressed on exit - nothing to restore, so once the
+    # process is configured there is nothing to do at all
+    return nullcontext() if _CONFIGURED else _configuring_context()
@@ -1,246 +1,553 @@
 import os
-import puremagic
-import PyPDF2
-from typing import Dict, Any
+import re
+import mmap
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, List
 
+# PyPDF2 and puremagic are imported where used: puremagic is only needed
+# when the PDF signature is missing, and a PyPDF2 parse only for deep checks.
+# Optional: pypdfium2 (PDFium's C++ parser) replaces PyPDF2 when installed
 
-def validate_pdf(file_path: str) -> Dict[str, Any]:
+
+# A PDF starts with this signature (possibly after some leading junk) and
+# ends with an %%EOF trailer; only this many bytes at each end are scanned
+_PDF_SIGNATURE = b'%PDF-'
+_PDF_EOF = b'%%EOF'
+_SCAN_BYTES = 1024
+
+_PDF_EXTENSION = '.pdf'
+
+# First non-whitespace character of extracted text
+_NON_SPACE_RE = re.compile(r'\S')
+
+# What puremagic raises for unidentified (PureError, a LookupError) or empty
+# input; ImportError keeps the extension fallback without puremagic installed
+_MAGIC_ERRORS = (ImportError, LookupError, ValueError)
+
+# Header bytes read once per file for puremagic and the signature check
+_HEADER_BYTES = 4096
+
+# Validation results remembered per validator; an upload is validated more
+# than once per request (size check, validation, downstream re-checks)
+VALIDATION_CACHE_SIZE = 256
+
+
+def _copy_result(result: Dict[str, Any]) -> Dict[str, Any]:
     """
-    Comprehensive PDF validation using puremagic
+    Copy a validation result; values are immutable apart from one level of
+    nested dicts ('details'), so this is all deepcopy would do, only cheaper
     """
-    try:
-        # Check if file exists
-        if not os.path.exists(file_path):
-            return {'valid': False, 'error': 'File does not exist'}
-        
-        # Check file size (50MB limit)
-        file_size = os.path.getsize(file_path)
-        max_size = 50 * 1024 * 1024  # 50MB
-        
-        if file_size == 0:
-            return {'valid': False, 'error': 'File is empty'}
+    return {key: dict(value) if isinstance(value, dict) else value
+            for key, value in result.items()}
+
+
+def _memoize_by_file(func):
+    """
+    Cache a validator's results keyed by the path, the file's identity and
+    version (device, inode, mtime_ns, size) plus the call arguments, so a
+    file replaced under the same path is validated again. The path is part
+    of the key because results depend on it (extension checks, puremagic's
+    filename hint), and renames and hard links keep the inode
+    """
+    cache = OrderedDict()
+    lock = threading.Lock()
+    
+    @functools.wraps(func)
+    def wrapper(file_path, *args, **kwargs):
+        try:
+            st = os.stat(file_path)
+        except OSError:
+            # Nothing to key on; the validator reports the error
+            return func(file_path, *args, **kwargs)
         
-        if file_size > max_size:
-            return {'valid': False, 'error': f'File too large: {file_size / (1024*1024):.1f}MB (max: 50MB)'}
+        key = (os.fspath(file_path), st.st_dev, st.st_ino, st.st_mtime_ns, st.st_size,
+               args, tuple(sorted(kwargs.items())))
+        with lock:
+            cached = cache.get(key)
+            if cached is not None:
+                cache.move_to_end(key)
+                # Copies, so callers can't mutate the cached result
+                return _copy_result(cached)
         
-        # Check file type using puremagic
+        result = func(file_path, *args, **kwargs)
+        with lock:
+            cache[key] = _copy_result(result)
+            if len(cache) > VALIDATION_CACHE_SIZE:
+                cache.popitem(last=False)
+        return result
+    
+    def cache_clear():
+        with lock:
+            cache.clear()
+    
+    wrapper.cache_clear = cache_clear
+    return wrapper
+
+
+def _has_text(text: str) -> bool:
+    """Same as len(text.strip()) > 0, stopping at the first non-whitespace character"""
+    return _NON_SPACE_RE.search(text) is not None
+
+
+def _stripped_length(text: str) -> int:
+    """Same as len(text.strip()), from offsets instead of a stripped copy"""
+    first = _NON_SPACE_RE.search(text)
+    if first is None:
+        return 0
+    end = len(text)
+    while text[end - 1].isspace():
+        end -= 1
+    return end - first.start()
+
+
+def _has_pdf_ext(path: str) -> bool:
+    """Case-insensitive .pdf check that lowercases only the extension-sized tail"""
+    return path[-len(_PDF_EXTENSION):].lower() == _PDF_EXTENSION
+
+
+def _read_header(file_path: str, n: int = _HEADER_BYTES) -> bytes:
+    """Read the first ``n`` bytes of a file"""
+    with open(file_path, 'rb') as file:
+        return file.read(n)
+
+
+def _has_pdf_signature(header: bytes) -> bool:
+    """Byte compare for the PDF signature; puremagic is only needed without it"""
+    return header.startswith(_PDF_SIGNATURE) or header.find(_PDF_SIGNATURE, 0, _SCAN_BYTES) != -1
+
+
+@functools.lru_cache(maxsize=None)
+def _load_pdfium():
+    """pypdfium2 if installed, else None (the import is attempted once)"""
+    try:
+        import pypdfium2 as pdfium
+    except ImportError:
+        return None
+    return pdfium
+
+
+# PDFium is not thread-safe, and validators run on Waitress threads, the job
+# pool and validate_many's workers, so every PDFium call holds this lock
+_pdfium_lock = threading.Lock()
+
+
+def _pdfium_inspect(pdfium, file_path: str, text: bool = False):
+    """
+    Page count and, when ``text`` is set, whether the first page has text
+    characters (else False), from PDFium; raises pdfium.PdfiumError for
+    unreadable documents
+    """
+    with _pdfium_lock:
+        pdf = pdfium.PdfDocument(file_path)
         try:
-            # Using puremagic to detect MIME type
-            file_type = puremagic.from_file(file_path, mime=True)
-            if file_type != 'application/pdf':
-                return {'valid': False, 'error': f'Invalid file type: {file_type}. Expected PDF.'}
-        except Exception as e:
-            # Fallback to extension check if puremagic fails
-            if not file_path.lower().endswith('.pdf'):
-                return {'valid': False, 'error': f'File type detection failed and no .pdf extension: {str(e)}'}
-            # If it has .pdf extension but puremagic failed, we'll continue with PyPDF2 validation
-        
-        # Try to open and validate with PyPDF2
+            num_pages = len(pdf)
+            has_text = False
+            if text and num_pages > 0:
+                page = pdf[0]
+                textpage = page.get_textpage()
+                has_text = textpage.count_chars() > 0
+                textpage.close()
+                page.close()
+            return num_pages, has_text
+        finally:
+            pdf.close()
+
+
+def _stat_or_error(file_path: str):
+    """
+    Stat the file once; returns (size, None), or (None, error dict) if it is
+    missing or unreadable
+    """
+    try:
+        return os.stat(file_path).st_size, None
+    except FileNotFoundError:
+        return None, {'valid': False, 'error': 'File does not exist'}
+    except PermissionError as e:
+        return None, {'valid': False, 'error': f'File is not accessible: {str(e)}'}
+    except OSError as e:
+        return None, {'valid': False, 'error': str(e)}
+
+
+@_memoize_by_file
+def validate_pdf(file_path: str, deep: bool = False) -> Dict[str, Any]:
+    """
+    PDF validation from the file's header and trailer bytes; PyPDF2 parses the
+    document only when ``deep`` is set or the bytes leave the question open
+    """
+    # Accept pathlib.Path as well; the helpers work on the string
+    file_path = os.fspath(file_path)
+    
+    # Open first and size the open file, so existence, size and contents
+    # all come from the same file without another path lookup
+    try:
+        with open(file_path, 'rb') as file:
+            # Check file size (50MB limit)
+            file_size = os.fstat(file.fileno()).st_size
+            max_size = 50 * 1024 * 1024  # 50MB
+            
+            if file_size == 0:
+                return {'valid': False, 'error': 'File is empty'}
+            
+            if file_size > max_size:
+                return {'valid': False, 'error': f'File too large: {file_size / (1024*1024):.1f}MB (max: 50MB)'}
+            
+            # Search the mapped file in place (the signature in the first KiB,
+            # the trailer in the last); bytes are copied out only as needed
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                signature_at = mm.find(_PDF_SIGNATURE, 0, _SCAN_BYTES)
+                has_trailer = mm.find(_PDF_EOF, max(0, file_size - _SCAN_BYTES)) != -1
+                if signature_at == -1:
+                    head = mm[:_HEADER_BYTES]
+                else:
+                    version_at = signature_at + len(_PDF_SIGNATURE)
+                    pdf_version = mm[version_at:version_at + 3].decode('latin-1')
+    except FileNotFoundError:
+        return {'valid': False, 'error': 'File does not exist'}
+    except OSError as e:
+        return {'valid': False, 'error': f'Validation error: {str(e)}'}
+    
+    if signature_at == -1:
+        # No signature: let puremagic name the actual file type. Only a
+        # positive PDF match earns a parse; a .pdf extension alone does not,
+        # since parsing non-PDFs to failure is slow and an attack surface
         try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-                
-                if num_pages == 0:
-                    return {'valid': False, 'error': 'PDF has no pages'}
-                
-                # Try to read first page to ensure it's not corrupted
-                first_page = pdf_reader.pages[0]
-                text = first_page.extract_text()
-                
-        except PyPDF2.errors.PdfReadError as e:
-            return {'valid': False, 'error': f'Corrupted PDF: {str(e)}'}
-        except Exception as e:
-            return {'valid': False, 'error': f'PDF validation failed: {str(e)}'}
+            import puremagic
+            file_type = puremagic.from_string(head, mime=True, filename=file_path)
+        except _MAGIC_ERRORS:
+            return {'valid': False, 'error': 'Invalid file type: no PDF signature. Expected PDF.'}
+        if file_type != 'application/pdf':
+            return {'valid': False, 'error': f'Invalid file type: {file_type}. Expected PDF.'}
+        # puremagic matched it some other way (e.g. its trailer), so let the parser decide
+        deep = True
+    elif not has_trailer:
+        # Truncated, or data appended after the trailer
+        deep = True
+    
+    result = {'valid': True, 'file_size': file_size}
+    if signature_at != -1:
+        result['pdf_version'] = pdf_version
+    
+    if deep:
+        pdfium = _load_pdfium()
+        if pdfium is not None:
+            # Parse with PDFium. Parser guards stay broad: malformed uploads
+            # make PDF parsers raise arbitrary exception types
+            try:
+                num_pages, _ = _pdfium_inspect(pdfium, file_path)
+            except pdfium.PdfiumError as e:
+                return {'valid': False, 'error': f'Corrupted PDF: {str(e)}'}
+            except Exception as e:
+                return {'valid': False, 'error': f'PDF validation failed: {str(e)}'}
+        else:
+            # Try to open and validate with PyPDF2
+            import PyPDF2
+            try:
+                with open(file_path, 'rb') as file:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                    num_pages = len(pdf_reader.pages)
+            except PyPDF2.errors.PdfReadError as e:
+                return {'valid': False, 'error': f'Corrupted PDF: {str(e)}'}
+            except Exception as e:
+                return {'valid': False, 'error': f'PDF validation failed: {str(e)}'}
         
-        return {
-            'valid': True,
-            'file_size': file_size,
-            'num_pages': num_pages,
-            'has_text': len(text.strip()) > 0
-        }
+        if num_pages == 0:
+            return {'valid': False, 'error': 'PDF has no pages'}
         
-    except Exception as e:
-        return {'valid': False, 'error': f'Validation error: {str(e)}'}
+        result['num_pages'] = num_pages
+    
+    return result
+
+
+def _page_has_fonts(page) -> bool:
+    """
+    Check if a page's resources declare fonts, i.e. it can show text and is
+    not a pure image page; no content stream is interpreted
+    """
+    resources = page.get('/Resources')
+    if resources is None:
+        return False
+    fonts = resources.get_object().get('/Font')
+    return fonts is not None and len(fonts.get_object()) > 0
+
+
+def validate_many(file_paths: List[str]) -> List[Dict[str, Any]]:
+    """
+    Validate several PDFs concurrently; results are in input order. Validation
+    is mostly file I/O, which releases the GIL, so threads overlap it
+    """
+    # Each distinct path is validated once; repeats get their own copy
+    unique_paths = list(dict.fromkeys(file_paths))
+    if not unique_paths:
+        return []
+    
+    max_workers = min(32, (os.cpu_count() or 1) * 4, len(unique_paths))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        results = dict(zip(unique_paths, executor.map(validate_pdf, unique_paths)))
+    
+    seen = set()
+    ordered = []
+    for path in file_paths:
+        ordered.append(_copy_result(results[path]) if path in seen else results[path])
+        seen.add(path)
+    return ordered
+
+
+def pdf_has_text(file_path: str, deep_text_check: bool = False) -> bool:
+    """
+    Check if the first page has text: by its font resources, or by actually
+    extracting the text (the most expensive PyPDF2 call) with ``deep_text_check``
+    """
+    try:
+        import PyPDF2
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            if len(pdf_reader.pages) == 0:
+                return False
+            first_page = pdf_reader.pages[0]
+            if not deep_text_check:
+                return _page_has_fonts(first_page)
+            text = first_page.extract_text()
+            return _has_text(text)
+    except Exception:
+        return False
 
 
 def validate_file_extension(filename: str) -> bool:
     """
     Check if file has valid PDF extension
     """
-    allowed_extensions = ['.pdf']
-    return any(filename.lower().endswith(ext) for ext in allowed_extensions)
+    return _has_pdf_ext(filename)
 
 
 def check_file_size(file_path: str, max_size_mb: int = 50) -> Dict[str, Any]:
     """
     Check if file size is within limits
     """
-    try:
-        file_size = os.path.getsize(file_path)
-        max_size_bytes = max_size_mb * 1024 * 1024
-        
-        return {
-            'valid': file_size <= max_size_bytes,
-            'size_mb': file_size / (1024 * 1024),
-            'max_size_mb': max_size_mb
-        }
-    except Exception as e:
-        return {'valid': False, 'error': str(e)}
+    file_size, error = _stat_or_error(file_path)
+    if error:
+        return error
+    max_size_bytes = max_size_mb * 1024 * 1024
+    
+    return {
+        'valid': file_size <= max_size_bytes,
+        'size_mb': file_size / (1024 * 1024),
+        'max_size_mb': max_size_mb
+    }
 
 
-def advanced_pdf_validation(file_path: str) -> Dict[str, Any]:
+@_memoize_by_file
+def advanced_pdf_validation(file_path: str, deep_text_check: bool = False,
+                            diagnostics: bool = False) -> Dict[str, Any]:
     """
-    Advanced PDF validation with multiple checks using puremagic
+    Advanced PDF validation with multiple checks using puremagic.
+    'has_text' means the first page has font resources (it is not a pure image
+    page); ``deep_text_check`` extracts the text instead and reports its length.
+    The magic_* match details are reported for non-PDFs, or always with ``diagnostics``
     """
+    # Accept pathlib.Path as well; the helpers work on the string
+    file_path = os.fspath(file_path)
+    
+    # Basic file existence and size checks
+    file_size, error = _stat_or_error(file_path)
+    if error:
+        return error
+    
+    if file_size == 0:
+        return {'valid': False, 'error': 'File is empty'}
+    
+    # Multiple validation approaches
+    validation_results = {
+        'file_exists': True,
+        'file_size_ok': file_size <= 50 * 1024 * 1024,
+        'has_pdf_extension': _has_pdf_ext(file_path),
+        'mime_type_valid': False,
+        'pypdf2_readable': False,
+        'has_pages': False,
+        'has_text': False
+    }
+    
+    # MIME type validation from one header read: the PDF signature settles
+    # it, puremagic only runs when the signature is missing
+    header = None
     try:
-        # Basic file existence and size checks
-        if not os.path.exists(file_path):
-            return {'valid': False, 'error': 'File does not exist'}
-        
-        file_size = os.path.getsize(file_path)
-        if file_size == 0:
-            return {'valid': False, 'error': 'File is empty'}
-        
-        # Multiple validation approaches
-        validation_results = {
-            'file_exists': True,
-            'file_size_ok': file_size <= 50 * 1024 * 1024,
-            'has_pdf_extension': file_path.lower().endswith('.pdf'),
-            'mime_type_valid': False,
-            'pypdf2_readable': False,
-            'has_pages': False,
-            'has_text': False
-        }
-        
-        # MIME type validation with puremagic
-        try:
-            detected_mime = puremagic.from_file(file_path, mime=True)
-            validation_results['detected_mime_type'] = detected_mime
-            validation_results['mime_type_valid'] = detected_mime == 'application/pdf'
-        except Exception as e:
-            validation_results['mime_detection_error'] = str(e)
-        
-        # Alternative: Use puremagic.magic_file for more detailed info
-        try:
-            magic_results = puremagic.magic_file(file_path)
-            if magic_results:
-                # Get the highest confidence match
-                best_match = magic_results[0]
-                validation_results['magic_extension'] = best_match[0]
-                validation_results['magic_mime'] = best_match[1]
-                validation_results['magic_description'] = best_match[2]
-                validation_results['magic_confidence'] = best_match[3]
-                
-                # Check if any of the matches indicate PDF
-                pdf_matches = [match for match in magic_results if 
-                             match[0] == '.pdf' or match[1] == 'application/pdf']
-                validation_results['has_pdf_matches'] = len(pdf_matches) > 0
-        except Exception as e:
-            validation_results['magic_file_error'] = str(e)
-        
-        # PyPDF2 validation
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-                
-                validation_results['pypdf2_readable'] = True
-                validation_results['num_pages'] = num_pages
-                validation_results['has_pages'] = num_pages > 0
-                
-                if num_pages > 0:
-                    try:
-                        first_page = pdf_reader.pages[0]
+        header = _read_header(file_path)
+        if _has_pdf_signature(header):
+            detected_mime = 'application/pdf'
+        else:
+            import puremagic
+            detected_mime = puremagic.from_string(header, mime=True, filename=file_path)
+        validation_results['detected_mime_type'] = detected_mime
+        validation_results['mime_type_valid'] = detected_mime == 'application/pdf'
+    except (OSError,) + _MAGIC_ERRORS as e:
+        validation_results['mime_detection_error'] = str(e)
+    
+    # Alternative: Use puremagic.magic_string for more detailed info
+    try:
+        if validation_results['mime_type_valid'] and not diagnostics:
+            magic_results = None
+            validation_results['has_pdf_matches'] = True
+        elif header is not None:
+            import puremagic
+            magic_results = puremagic.magic_string(header, filename=file_path)
+        else:
+            magic_results = None
+        if magic_results:
+            # Get the highest confidence match
+            best_match = magic_results[0]
+            validation_results['magic_extension'] = best_match[0]
+            validation_results['magic_mime'] = best_match[1]
+            validation_results['magic_description'] = best_match[2]
+            validation_results['magic_confidence'] = best_match[3]
+            
+            # Check if any of the matches indicate PDF
+            pdf_matches = [match for match in magic_results if 
+                         match[0] == '.pdf' or match[1] == 'application/pdf']
+            validation_results['has_pdf_matches'] = len(pdf_matches) > 0
+    except _MAGIC_ERRORS as e:
+        validation_results['magic_file_error'] = str(e)
+    
+    # PyPDF2 validation
+    import PyPDF2
+    try:
+        with open(file_path, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            num_pages = len(pdf_reader.pages)
+            
+            validation_results['pypdf2_readable'] = True
+            validation_results['num_pages'] = num_pages
+            validation_results['has_pages'] = num_pages > 0
+            
+            if num_pages > 0:
+                try:
+                    first_page = pdf_reader.pages[0]
+                    if deep_text_check:
                         text = first_page.extract_text()
-                        validation_results['has_text'] = len(text.strip()) > 0
-                        validation_results['first_page_text_length'] = len(text.strip())
-                    except Exception as e:
-                        validation_results['text_extraction_error'] = str(e)
-                
-        except PyPDF2.errors.PdfReadError as e:
-            validation_results['pypdf2_error'] = f'PDF read error: {str(e)}'
-        except Exception as e:
-            validation_results['pypdf2_error'] = f'General PDF error: {str(e)}'
-        
-        # Determine overall validity
-        is_valid = (
-            validation_results['file_size_ok'] and
-            validation_results['has_pdf_extension'] and
-            validation_results['pypdf2_readable'] and
-            validation_results['has_pages']
-        )
-        
-        # If MIME type detection worked, include it in validation
-        if 'detected_mime_type' in validation_results:
-            is_valid = is_valid and validation_results['mime_type_valid']
-        
-        return {
-            'valid': is_valid,
-            'file_size': file_size,
-            'details': validation_results
-        }
-        
+                        text_length = _stripped_length(text)
+                        validation_results['has_text'] = text_length > 0
+                        validation_results['first_page_text_length'] = text_length
+                    else:
+                        validation_results['has_text'] = _page_has_fonts(first_page)
+                except Exception as e:
+                    validation_results['text_extraction_error'] = str(e)
+            
+    except PyPDF2.errors.PdfReadError as e:
+        validation_results['pypdf2_error'] = f'PDF read error: {str(e)}'
     except Exception as e:
-        return {'valid': False, 'error': f'Advanced validation error: {str(e)}'}
+        validation_results['pypdf2_error'] = f'General PDF error: {str(e)}'
+    
+    # Determine overall validity
+    is_valid = (
+        validation_results['file_size_ok'] and
+        validation_results['has_pdf_extension'] and
+        validation_results['pypdf2_readable'] and
+        validation_results['has_pages']
+    )
+    
+    # If MIME type detection worked, include it in validation
+    if 'detected_mime_type' in validation_results:
+        is_valid = is_valid and validation_results['mime_type_valid']
+    
+    return {
+        'valid': is_valid,
+        'file_size': file_size,
+        'details': validation_results
+    }
 
 
-def validate_pdf_with_fallback(file_path: str) -> Dict[str, Any]:
+def validate_pdf_with_fallback(file_path: str, deep_text_check: bool = False) -> Dict[str, Any]:
     """
-    PDF validation with multiple fallback methods
+    PDF validation with multiple fallback methods. Parsed with pypdfium2 when
+    installed ('has_text': the first page has text characters), else with
+    PyPDF2 ('has_text' as in advanced_pdf_validation)
     """
+    # Accept pathlib.Path as well; the helpers work on the string
+    file_path = os.fspath(file_path)
+    
+    # Step 1: Basic checks, on the one open file used by every step
     try:
-        # Step 1: Basic checks
-        if not os.path.exists(file_path):
-            return {'valid': False, 'error': 'File does not exist'}
-        
-        file_size = os.path.getsize(file_path)
-        if file_size == 0:
-            return {'valid': False, 'error': 'File is empty'}
-        
-        if file_size > 50 * 1024 * 1024:
-            return {'valid': False, 'error': f'File too large: {file_size / (1024*1024):.1f}MB (max: 50MB)'}
-        
-        # Step 2: Try puremagic first
-        mime_type_valid = False
-        try:
-            detected_type = puremagic.from_file(file_path, mime=True)
-            mime_type_valid = detected_type == 'application/pdf'
+        file = open(file_path, 'rb', buffering=65536)
+    except FileNotFoundError:
+        return {'valid': False, 'error': 'File does not exist'}
+    except OSError as e:
+        return {'valid': False, 'error': f'Validation error: {str(e)}'}
+    
+    try:
+        with file:
+            file_size = os.fstat(file.fileno()).st_size
+            if file_size == 0:
+                return {'valid': False, 'error': 'File is empty'}
+            
+            if file_size > 50 * 1024 * 1024:
+                return {'valid': False, 'error': f'File too large: {file_size / (1024*1024):.1f}MB (max: 50MB)'}
+            
+            # Step 2: Try puremagic first
+            mime_type_valid = False
+            try:
+                # peek() fills the read buffer without moving the file position
+                header = file.peek(_HEADER_BYTES)[:_HEADER_BYTES]
+                if _has_pdf_signature(header):
+                    mime_type_valid = True
+                else:
+                    import puremagic
+                    detected_type = puremagic.from_string(header, mime=True, filename=file_path)
+                    mime_type_valid = detected_type == 'application/pdf'
+                if not mime_type_valid:
+                    # Try the more detailed magic_string method on the same header
+                    magic_results = puremagic.magic_string(header, filename=file_path)
+                    if magic_results:
+                        pdf_matches = [m for m in magic_results if '.pdf' in m[0] or 'application/pdf' in m[1]]
+                        mime_type_valid = len(pdf_matches) > 0
+            except (OSError,) + _MAGIC_ERRORS:
+                # If puremagic fails, fall back to extension check
+                mime_type_valid = _has_pdf_ext(file_path)
+            
             if not mime_type_valid:
-                # Try the more detailed magic_file method
-                magic_results = puremagic.magic_file(file_path)
-                if magic_results:
-                    pdf_matches = [m for m in magic_results if '.pdf' in m[0] or 'application/pdf' in m[1]]
-                    mime_type_valid = len(pdf_matches) > 0
-        except Exception:
-            # If puremagic fails, fall back to extension check
-            mime_type_valid = file_path.lower().endswith('.pdf')
-        
-        # Step 3: Validate with PyPDF2
-        try:
-            with open(file_path, 'rb') as file:
-                pdf_reader = PyPDF2.PdfReader(file)
-                num_pages = len(pdf_reader.pages)
-                
-                if num_pages == 0:
-                    return {'valid': False, 'error': 'PDF has no pages'}
-                
-                # Try to read first page
-                first_page = pdf_reader.pages[0]
-                text = first_page.extract_text()
-                
-                return {
-                    'valid': mime_type_valid,
-                    'file_size': file_size,
-                    'num_pages': num_pages,
-                    'has_text': len(text.strip()) > 0,
-                    'mime_type_valid': mime_type_valid
-                }
-                
-        except PyPDF2.errors.PdfReadError as e:
-            return {'valid': False, 'error': f'Corrupted PDF: {str(e)}'}
-        except Exception as e:
-            return {'valid': False, 'error': f'PDF validation failed: {str(e)}'}
-        
-    except Exception as e:
+                # Not a PDF by any check: no parser runs on it
+                return {'valid': False, 'error': 'Invalid file type. Expected PDF.', 'mime_type_valid': False}
+            
+            # Step 3: Validate with PDFium, or PyPDF2 without it
+            pdfium = _load_pdfium()
+            if pdfium is not None:
+                # PDFium does its own file I/O in C, so it is given the path
+                try:
+                    num_pages, has_text = _pdfium_inspect(pdfium, file_path, text=True)
+                except pdfium.PdfiumError as e:
+                    return {'valid': False, 'error': f'Corrupted PDF: {str(e)}'}
+                except Exception as e:
+                    return {'valid': False, 'error': f'PDF validation failed: {str(e)}'}
+            else:
+                import PyPDF2
+                try:
+                    # The header was only peeked, so the reader starts at offset 0
+                    pdf_reader = PyPDF2.PdfReader(file)
+                    num_pages = len(pdf_reader.pages)
+                    
+                    # Try to read first page
+                    has_text = False
+                    if num_pages > 0:
+                        first_page = pdf_reader.pages[0]
+                        if deep_text_check:
+                            has_text = _has_text(first_page.extract_text())
+                        else:
+                            has_text = _page_has_fonts(first_page)
+                    
+                except PyPDF2.errors.PdfReadError as e:
+                    return {'valid': False, 'error': f'Corrupted PDF: {str(e)}'}
+                except Exception as e:
+                    return {'valid': False, 'error': f'PDF validation failed: {str(e)}'}
+    except OSError as e:
         return {'valid': False, 'error': f'Validation error: {str(e)}'}
+    
+    if num_pages == 0:
+        return {'valid': False, 'error': 'PDF has no pages'}
+    
+    return {
+        'valid': mime_type_valid,
+        'file_size': file_size,
+        'num_pages': num_pages,
+        'has_text': has_text,
+        'mime_type_valid': mime_type_valid
+    }